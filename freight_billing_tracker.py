@@ -1,43 +1,300 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import io
 import os
 import json
 import re
+import calendar
+import collections
+import functools
+import hmac
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import hashlib
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import xxhash
+
+try:
+    import orjson
+except ImportError:  # optional; config I/O falls back to the stdlib json module
+    orjson = None
+
+
+def read_excel(source, **kwargs):
+    """Read an Excel file with the Rust-based calamine engine, falling back to openpyxl"""
+    try:
+        return pd.read_excel(source, engine='calamine', **kwargs)
+    except (ImportError, ValueError):
+        # python-calamine not installed, or a pandas version without the engine
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_excel(source, engine='openpyxl', **kwargs)
+
+
+def read_csv(source, **kwargs):
+    """Read a CSV file with the multithreaded pyarrow parser into Arrow-backed columns"""
+    try:
+        return pd.read_csv(source, engine='pyarrow', dtype_backend='pyarrow', **kwargs)
+    except (ImportError, pd.errors.ParserError):
+        # Files the stricter pyarrow parser rejects (e.g. ragged rows) go through the C parser
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_csv(source, **kwargs)
+
+
+def read_csv_head(source, nrows):
+    """Read only the first rows of a CSV file, parsing just the first block with pyarrow"""
+    try:
+        reader = pacsv.open_csv(source)
+        return reader.read_next_batch().slice(0, nrows).to_pandas()
+    except (pa.ArrowInvalid, StopIteration):
+        # Unparseable for pyarrow (e.g. ragged rows) or header-only files
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_csv(source, nrows=nrows)
+
+
+def write_excel(sheets, path=None, chunk_rows=10000):
+    """
+    Write (sheet_name, DataFrame) pairs to xlsx bytes, or to path if given,
+    using openpyxl's write-only mode, which streams rows out instead of
+    holding every cell object in memory
+    """
+    # openpyxl is only needed for exports, so reruns don't pay for importing it
+    import openpyxl
+    
+    workbook = openpyxl.Workbook(write_only=True)
+    
+    for sheet_name, df in sheets:
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append([str(col) for col in df.columns])
+        
+        # Plain Python values with None for missing cells, converted chunk_rows
+        # rows at a time so only one chunk exists as Python objects at once
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            columns = [chunk[col].astype(object).where(chunk[col].notna(), None) for col in chunk.columns]
+            for row in zip(*columns):
+                worksheet.append(row)
+    
+    if path is not None:
+        workbook.save(path)
+        return path
+    
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def profit_margin(profit, billable):
+    """Profit as a percentage of billable, rounded to 2 places; 0 where nothing was billed"""
+    profit = np.asarray(profit, dtype='float64')
+    billable = np.asarray(billable, dtype='float64')
+    margin = np.divide(profit, billable, out=np.zeros_like(profit), where=billable != 0)
+    return np.round(margin * 100, 2)
+
+
+def write_parquet_zip(sheets):
+    """Write (sheet_name, DataFrame) pairs as zstd Parquet files, one per sheet, in a zip archive"""
+    output = io.BytesIO()
+    
+    # Parquet pages are already compressed, so the archive just stores them
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for sheet_name, df in sheets:
+            archive.writestr(
+                f"{sheet_name}.parquet",
+                df.to_parquet(index=False, engine='pyarrow', compression='zstd')
+            )
+    
+    return output.getvalue()
+
+
+def synchronized(method):
+    """Run a FreightBillingChecker method while holding the instance's lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class FreightBillingChecker:
+    # Precompiled cycle period patterns and month lookups for normalize_cycle_period
+    _RE_YYYY_MM = re.compile(r'^\d{4}-\d{2}$')
+    _RE_YYYY_MM_WEEK = re.compile(r'^\d{4}-\d{2}-Week\d+$', re.IGNORECASE)
+    _RE_MONTH_YYYY = re.compile(r'^([A-Za-z]+)(\d{4})$')
+    _RE_MON_YY = re.compile(r'^([A-Za-z]{3})(\d{2})$')
+    _MONTH_NAMES = {name.lower(): num for num, name in enumerate(calendar.month_name) if name}
+    _MONTH_ABBRS = {name.lower(): num for num, name in enumerate(calendar.month_abbr) if name}
+    # Carrier name separators replaced by spaces in parse_filename
+    _TITLE_TRANS = str.maketrans('-_', '  ')
+    # Code the user must type before clear_all_data deletes everything
+    RESET_CONFIRMATION_CODE = "DELETE_ALL_BILLING_DATA"
+    # Client name given to shipments whose client cell is missing or blank
+    BLANK_CLIENT = "(blank)"
+    # Memory budget of _df_cache in bytes; every filter selection adds an entry
+    DF_CACHE_BYTES = 256 * 1024 * 1024
+    
+    # Known header variants for each standard shipment column
+    STANDARD_COLUMN_VARIANTS = {
+        'client': [
+            'client', 'customer', 'customer_name', 'account', 'consignee', 
+            'shipper', 'company', 'client_name', 'customer name', 'account name'
+        ],
+        'tracking_number': [
+            'tracking', 'tracking_number', 'tracking_id', 'awb', 'pro', 
+            'tracking number', 'tracking id', 'shipment id', 'reference'
+        ],
+        'service_type': [
+            'service', 'service_type', 'service_level', 'service type',
+            'service level', 'shipping service', 'delivery service'
+        ],
+        'cost': [
+            'cost', 'freight_cost', 'shipping_cost', 'carrier_charge', 
+            'total_cost', 'total cost', 'freight cost', 'shipping cost',
+            'carrier cost', 'transport cost', 'delivery cost'
+        ],
+        'billable_amount': [
+            'billable', 'billable_amount', 'revenue', 'charge_amount', 
+            'bill_amount', 'invoice_amount', 'billable amount', 'bill amount',
+            'invoice amount', 'charge amount', 'total billable', 'total_billable'
+        ],
+        'weight': [
+            'weight', 'package_weight', 'total_weight', 'package weight',
+            'total weight', 'shipment weight', 'gross weight'
+        ],
+        'zone': [
+            'zone', 'delivery_zone', 'shipping_zone', 'delivery zone',
+            'shipping zone', 'service zone'
+        ],
+        'ship_date': [
+            'date', 'ship_date', 'pickup_date', 'service_date', 'ship date',
+            'pickup date', 'service date', 'shipment date', 'send date'
+        ],
+        'delivery_date': [
+            'delivery_date', 'delivered_date', 'delivery', 'delivery date',
+            'delivered date', 'arrival date', 'completion date'
+        ]
+    }
+    
+    # Arrow schema of the partitioned shipment dataset; carrier and cycle_period
+    # are stored in the hive partition directory names rather than in the files
+    SHIPMENT_SCHEMA = pa.schema([
+        ('carrier', pa.string()),
+        ('client', pa.string()),
+        ('tracking_number', pa.string()),
+        ('service_type', pa.string()),
+        ('cost', pa.float64()),
+        ('billable_amount', pa.float64()),
+        ('weight', pa.float32()),
+        ('zone', pa.string()),
+        ('ship_date', pa.timestamp('ns')),
+        ('delivery_date', pa.timestamp('ns')),
+        ('invoice_status', pa.string()),
+        ('invoice_number', pa.string()),
+        ('invoice_date', pa.timestamp('ns')),
+        ('cycle_period', pa.string()),
+        ('upload_timestamp', pa.timestamp('ns')),
+        ('file_hash', pa.string())
+    ])
+    # In-memory dtypes shared by loaded shipments and new uploads: low-cardinality
+    # text as categoricals, the rest as Arrow-backed strings instead of object arrays
+    SHIPMENT_DTYPES = {
+        'carrier': 'category',
+        'client': 'category',
+        'tracking_number': 'string[pyarrow]',
+        'service_type': 'category',
+        'cost': 'float64',
+        'billable_amount': 'float64',
+        'weight': 'float32',
+        'zone': 'category',
+        'ship_date': 'datetime64[ns]',
+        'delivery_date': 'datetime64[ns]',
+        'invoice_status': 'category',
+        'invoice_number': 'string[pyarrow]',
+        'invoice_date': 'datetime64[ns]',
+        'cycle_period': 'category',
+        'upload_timestamp': 'datetime64[ns]',
+        'file_hash': 'string[pyarrow]'
+    }
+    # Upload log columns, and defaults for columns missing from older logs
+    UPLOAD_LOG_COLUMNS = [
+        'filename', 'file_hash', 'upload_date', 'records_imported',
+        'carrier', 'cycle_period', 'status', 'deleted_date', 'source_path'
+    ]
+    UPLOAD_LOG_DEFAULTS = {'status': 'Active'}
+    SHIPMENT_PARTITIONING = ds.partitioning(
+        pa.schema([('carrier', pa.string()), ('cycle_period', pa.string())]),
+        flavor='hive'
+    )
+    
     def __init__(self, data_folder="billing_data"):
         """Initialize the billing checker with Excel file storage"""
         self.data_folder = Path(data_folder)
         self.data_folder.mkdir(exist_ok=True)
         
-        # Excel file paths
-        self.shipment_data_file = self.data_folder / "shipment_data.xlsx"
-        self.billing_checklist_file = self.data_folder / "billing_checklist.xlsx"
-        self.upload_log_file = self.data_folder / "upload_log.xlsx"
+        # Data file paths (shipment data is a Parquet dataset partitioned by
+        # carrier/cycle_period, the checklist and upload log single Parquet files)
+        self.shipment_data_dir = self.data_folder / "shipments"
+        self.legacy_shipment_data_files = [
+            self.data_folder / "shipment_data.parquet",
+            self.data_folder / "shipment_data.xlsx"
+        ]
+        self.billing_checklist_file = self.data_folder / "billing_checklist.parquet"
+        self.legacy_billing_checklist_file = self.data_folder / "billing_checklist.xlsx"
+        self.upload_log_file = self.data_folder / "upload_log.parquet"
+        self.legacy_upload_log_file = self.data_folder / "upload_log.xlsx"
         self.config_file = self.data_folder / "config.json"
+        self.processed_files_journal = self.data_folder / "processed_files.jsonl"
+        
+        # get_checker shares one instance between all sessions and Streamlit's
+        # script threads, so cache access and data writes hold this lock
+        self._lock = threading.RLock()
+        # Loaded and derived DataFrames keyed by (path, columns, filter) or
+        # (path, name, args), least recently used first, see _cached
+        self._df_cache = collections.OrderedDict()
+        # Estimated memory held by _df_cache, see _cache_nbytes
+        self._df_cache_bytes = 0
+        # Processed source paths as (upload log key, set), see get_processed_files
+        self._processed_cache = None
+        
+        # Normalized header variant -> standard column, first variant wins
+        self._variant_map = {}
+        for standard, variants in self.STANDARD_COLUMN_VARIANTS.items():
+            for variant in variants:
+                self._variant_map.setdefault(variant.lower().replace(' ', '').replace('_', ''), standard)
         
         self.init_excel_files()
         self.load_config()
     
     def init_excel_files(self):
-        """Create Excel files if they don't exist"""
-        
-        # Initialize shipment data file
-        if not self.shipment_data_file.exists():
-            shipment_df = pd.DataFrame(columns=[
-                'carrier', 'client', 'tracking_number', 'service_type', 
-                'cost', 'billable_amount', 'weight', 'zone', 
-                'ship_date', 'delivery_date', 'invoice_status', 
-                'invoice number', 'invoice date', 'cycle_period', 
-                'upload_timestamp', 'file_hash'
-            ])
-            shipment_df.to_excel(self.shipment_data_file, index=False)
+        """Create data files if they don't exist"""
+        
+        # Migrate shipment data, checklist and upload log from the legacy stores on first run
+        if not self.shipment_data_dir.exists():
+            for legacy_file in self.legacy_shipment_data_files:
+                if legacy_file.exists():
+                    if legacy_file.suffix == '.parquet':
+                        self.save_shipment_data(pd.read_parquet(legacy_file))
+                    else:
+                        self.save_shipment_data(read_excel(legacy_file))
+                    break
+        if not self.billing_checklist_file.exists() and self.legacy_billing_checklist_file.exists():
+            self.save_billing_checklist(read_excel(self.legacy_billing_checklist_file))
+        if not self.upload_log_file.exists() and self.legacy_upload_log_file.exists():
+            self.save_upload_log(read_excel(self.legacy_upload_log_file))
+        
+        # Initialize shipment dataset directory
+        self.shipment_data_dir.mkdir(exist_ok=True)
         
         # Initialize billing checklist file
         if not self.billing_checklist_file.exists():
@@ -46,28 +303,26 @@ class FreightBillingChecker:
                 'total_cost', 'total_billable', 'profit', 'profit_margin',
                 'invoice_status', 'invoice number', 'invoice date', 'notes'
             ])
-            checklist_df.to_excel(self.billing_checklist_file, index=False)
+            self.save_billing_checklist(checklist_df)
         
         # Initialize upload log file
         if not self.upload_log_file.exists():
-            log_df = pd.DataFrame(columns=[
-                'filename', 'file_hash', 'upload_date', 'records_imported',
-                'carrier', 'cycle_period','status', 'deleted_date', 'source_path'
-            ])
-            log_df.to_excel(self.upload_log_file, index=False)
+            self.save_upload_log(pd.DataFrame(columns=self.UPLOAD_LOG_COLUMNS))
     
     def load_config(self):
         """Load configuration from JSON file"""
         default_config = {
             'input_folder': '',
             'filename_pattern': 'auto',  # auto, manual
-            'processed_files': []  # List of processed file paths
         }
         
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    self.config = json.load(f)
+                if orjson is not None:
+                    self.config = orjson.loads(self.config_file.read_bytes())
+                else:
+                    with open(self.config_file, 'r') as f:
+                        self.config = json.load(f)
                 # Ensure all keys exist
                 for key, value in default_config.items():
                     if key not in self.config:
@@ -76,12 +331,52 @@ class FreightBillingChecker:
                 self.config = default_config
         else:
             self.config = default_config
+        
+        # Processed paths live in an append-only journal, one JSON string per line,
+        # so marking a file appends a line instead of rewriting config.json
+        processed_files = set()
+        if self.processed_files_journal.exists():
+            with open(self.processed_files_journal, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        processed_files.add(json.loads(line))
+                    except ValueError:
+                        continue  # Skip a line torn by an interrupted append
+        legacy_processed = self.config.pop('processed_files', None)
+        self.config['processed_files'] = processed_files
+        if legacy_processed:
+            # Move the list from older config.json files into the journal
+            processed_files.update(map(str, legacy_processed))
+            self._write_processed_journal()
+            self.save_config()
     
+    @synchronized
     def save_config(self):
         """Save configuration to JSON file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
-    
+        config_out = {key: value for key, value in self.config.items() if key != 'processed_files'}
+        if orjson is not None:
+            self.config_file.write_bytes(orjson.dumps(config_out, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.config_file, 'w') as f:
+                json.dump(config_out, f, indent=2)
+    
+    @synchronized
+    def _write_processed_journal(self):
+        """Rewrite the processed files journal from the in-memory set (compaction)"""
+        tmp_path = self.processed_files_journal.with_suffix('.jsonl.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(path) + '\n' for path in sorted(self.config['processed_files']))
+        os.replace(tmp_path, self.processed_files_journal)
+        self._processed_cache = None
+    
+    @synchronized
+    def clear_processed_files(self):
+        """Forget every processed file by truncating the journal"""
+        open(self.processed_files_journal, 'w').close()
+        self.config['processed_files'] = set()
+        self._processed_cache = None
+    
+    @synchronized
     def set_input_folder(self, folder_path):
         """Set the input folder path"""
         self.config['input_folder'] = folder_path
@@ -91,7 +386,30 @@ class FreightBillingChecker:
         """Get the configured input folder path"""
         return self.config.get('input_folder', '')
     
-    def parse_filename(self, filename):
+    @synchronized
+    def get_processed_files(self):
+        """
+        Set of file paths already imported, from the processed files journal and
+        the upload log. Cached until the upload log changes on disk or the
+        journal is written.
+        """
+        try:
+            log_key = self._stat_key(self.upload_log_file)
+        except OSError:
+            log_key = None
+        
+        if self._processed_cache is None or self._processed_cache[0] != log_key:
+            processed_files = set(self.config.get('processed_files', ()))
+            upload_log = self.load_upload_log()
+            if not upload_log.empty:
+                processed_files.update(upload_log['source_path'].dropna().tolist())
+            self._processed_cache = (log_key, processed_files)
+        
+        return self._processed_cache[1]
+    
+    @classmethod
+    @functools.lru_cache(maxsize=8192)
+    def parse_filename(cls, filename):
         """
         Parse carrier name and cycle period from filename.
         Supports multiple formats:
@@ -113,10 +431,10 @@ class FreightBillingChecker:
             cycle_part = parts[1].strip()
             
             # Clean up carrier name (replace common separators)
-            carrier_name = carrier_name.replace('-', ' ').replace('_', ' ').title()
+            carrier_name = carrier_name.translate(cls._TITLE_TRANS).title()
             
             # Try to normalize cycle period
-            cycle_period = self.normalize_cycle_period(cycle_part)
+            cycle_period = cls.normalize_cycle_period(cycle_part)
             
             return carrier_name, cycle_period
         
@@ -124,12 +442,14 @@ class FreightBillingChecker:
         parts = name_without_ext.split('-', 1)
         if len(parts) == 2:
             carrier_name = parts[0].strip().title()
-            cycle_period = self.normalize_cycle_period(parts[1].strip())
+            cycle_period = cls.normalize_cycle_period(parts[1].strip())
             return carrier_name, cycle_period
         
         return None, None
     
-    def normalize_cycle_period(self, cycle_str):
+    @classmethod
+    @functools.lru_cache(maxsize=8192)
+    def normalize_cycle_period(cls, cycle_str):
         """
         Normalize cycle period string to consistent format.
         Tries to convert various formats to YYYY-MM or keeps as-is.
@@ -137,34 +457,30 @@ class FreightBillingChecker:
         cycle_str = cycle_str.strip()
         
         # Already in YYYY-MM format
-        if re.match(r'^\d{4}-\d{2}$', cycle_str):
+        if cls._RE_YYYY_MM.match(cycle_str):
             return cycle_str
         
         # YYYY-MM-WeekN format - keep as is
-        if re.match(r'^\d{4}-\d{2}-Week\d+$', cycle_str, re.IGNORECASE):
+        if cls._RE_YYYY_MM_WEEK.match(cycle_str):
             return cycle_str
         
         # MonthYYYY format (e.g., November2024)
-        month_match = re.match(r'^([A-Za-z]+)(\d{4})$', cycle_str)
+        month_match = cls._RE_MONTH_YYYY.match(cycle_str)
         if month_match:
             month_name = month_match.group(1)
             year = month_match.group(2)
-            try:
-                month_num = datetime.strptime(month_name, '%B').month
+            month_num = cls._MONTH_NAMES.get(month_name.lower())
+            if month_num:
                 return f"{year}-{month_num:02d}"
-            except:
-                pass
         
         # MonthYY format (e.g., Nov24)
-        month_match = re.match(r'^([A-Za-z]{3})(\d{2})$', cycle_str)
+        month_match = cls._RE_MON_YY.match(cycle_str)
         if month_match:
             month_name = month_match.group(1)
             year = month_match.group(2)
-            try:
-                month_num = datetime.strptime(month_name, '%b').month
+            month_num = cls._MONTH_ABBRS.get(month_name.lower())
+            if month_num:
                 return f"20{year}-{month_num:02d}"
-            except:
-                pass
         
         # Return as-is if no pattern matches
         return cycle_str
@@ -187,35 +503,34 @@ class FreightBillingChecker:
         if not folder_path.is_dir():
             return [], f"Path is not a folder: {input_folder}"
         
-        # Get list of processed files
-        processed_files = set(self.config.get('processed_files', []))
-        upload_log = self.load_upload_log()
-        if not upload_log.empty and 'source_path' in upload_log.columns:
-            processed_files.update(upload_log['source_path'].dropna().tolist())
+        processed_files = self.get_processed_files()
         
         files_info = []
         
-        # Scan for Excel and CSV files
-        for ext in ['*.xlsx', '*.csv', '*.xls']:
-            for file_path in folder_path.glob(ext):
-                # Skip temporary files
-                if file_path.name.startswith('~$'):
+        # Scan for Excel and CSV files in a single directory pass
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                # Skip temporary files and anything that isn't a carrier file
+                # (is_file() reuses the file type from the directory listing, no extra stat)
+                if entry.name.startswith('~$') or not entry.name.lower().endswith(('.xlsx', '.csv', '.xls')):
+                    continue
+                if not entry.is_file():
                     continue
                 
                 # Parse filename
-                carrier, cycle = self.parse_filename(file_path.name)
+                carrier, cycle = self.parse_filename(entry.name)
                 
                 # Check if already processed
-                is_processed = str(file_path) in processed_files
+                is_processed = entry.path in processed_files
                 
-                # Get file info
-                file_stat = file_path.stat()
+                # Get file info (scandir caches the stat result on Windows)
+                file_stat = entry.stat()
                 file_size_mb = file_stat.st_size / (1024 * 1024)
                 modified_date = datetime.fromtimestamp(file_stat.st_mtime)
                 
                 files_info.append({
-                    'path': str(file_path),
-                    'filename': file_path.name,
+                    'path': entry.path,
+                    'filename': entry.name,
                     'carrier': carrier,
                     'cycle_period': cycle,
                     'size_mb': round(file_size_mb, 2),
@@ -229,6 +544,58 @@ class FreightBillingChecker:
         
         return files_info, None
     
+    def _read_carrier_file(self, file_path):
+        """
+        Read and hash a carrier file from disk, returning (df, file_hash, file_size_mb).
+        Touches no tracker state, so it can run on worker threads.
+        """
+        suffix = file_path.suffix.lower()
+        if suffix not in ('.xlsx', '.xls', '.csv'):
+            raise ValueError("Unsupported file format. Please use Excel or CSV.")
+        
+        file_size_mb = file_path.stat().st_size / (1024 * 1024)
+        
+        # Read the file once, hashing 1 MiB blocks as they stream into memory
+        hasher = xxhash.xxh3_128()
+        file_buffer = io.BytesIO()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(block)
+                file_buffer.write(block)
+        file_buffer.seek(0)
+        
+        # Read into DataFrame from the buffered bytes
+        if suffix == '.csv':
+            df = read_csv(file_buffer)
+        else:
+            df = read_excel(file_buffer)
+        
+        return df, hasher.hexdigest(), file_size_mb
+    
+    def _existing_data_error(self, carrier_name, cycle_period, replace_existing):
+        """
+        Check for existing carrier/cycle data, returning (error message or None,
+        number of rows to replace)
+        """
+        has_existing, existing_count = self.check_existing_data(carrier_name, cycle_period)
+        
+        if has_existing and not replace_existing:
+            return f"Data already exists for {carrier_name} - {cycle_period} ({existing_count:,} records). Use 'Replace Existing Data' option to update.", 0
+        
+        return None, existing_count if replace_existing else 0
+    
+    def _ingest_carrier_file(self, file_path, carrier_name, cycle_period, existing_count, read_result):
+        """Ingest the (df, file_hash, file_size_mb) read from file_path"""
+        df, file_hash, file_size_mb = read_result
+        return self._ingest_dataframe(
+            df, carrier_name, cycle_period,
+            file_hash=file_hash,
+            filename=file_path.name,
+            source_path=str(file_path),
+            file_size_mb=file_size_mb,
+            existing_count=existing_count
+        )
+    
     def process_file_from_path(self, file_path, carrier_name, cycle_period, replace_existing=False):
         """
         Process a carrier file from a file path (instead of uploaded file).
@@ -240,303 +607,352 @@ class FreightBillingChecker:
                 return False, f"File not found: {file_path}"
             
             # Check for existing data
-            has_existing, existing_count = self.check_existing_data(carrier_name, cycle_period)
-            
-            if has_existing and not replace_existing:
-                return False, f"Data already exists for {carrier_name} - {cycle_period} ({existing_count:,} records). Use 'Replace Existing Data' option to update."
-            
-            # Read file
-            file_size_mb = file_path.stat().st_size / (1024 * 1024)
-            
-            # Remove existing data if replacing
-            if replace_existing and has_existing:
-                self.remove_existing_data(carrier_name, cycle_period)
-            
-            # Read file content for hash
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
-            file_hash = self.get_file_hash(file_content)
-            
-            # Read into DataFrame
-            if str(file_path).endswith('.xlsx') or str(file_path).endswith('.xls'):
-                df = pd.read_excel(file_path, engine='openpyxl')
-            elif str(file_path).endswith('.csv'):
-                if file_size_mb > 10:
-                    chunk_list = []
-                    chunk_size = 10000
-                    for chunk in pd.read_csv(file_path, chunksize=chunk_size):
-                        chunk_list.append(chunk)
-                    df = pd.concat(chunk_list, ignore_index=True)
-                else:
-                    df = pd.read_csv(file_path)
-            else:
-                return False, "Unsupported file format. Please use Excel or CSV."
-            
-            # Clean up DataFrame
-            df = df.dropna(axis=1, how='all')
-            df = df.dropna(axis=0, how='all')
-            
-            # Remove columns that are mostly empty (>95% null)
-            null_threshold = 0.95
-            null_percentages = df.isnull().mean()
-            cols_to_keep = null_percentages[null_percentages < null_threshold].index
-            df = df[cols_to_keep]
-            
-            # Auto-detect columns
-            standard_columns = {
-                'client': [
-                    'client', 'customer', 'customer_name', 'account', 'consignee', 
-                    'shipper', 'company', 'client_name', 'customer name', 'account name'
-                ],
-                'tracking_number': [
-                    'tracking', 'tracking_number', 'tracking_id', 'awb', 'pro', 
-                    'tracking number', 'tracking id', 'shipment id', 'reference'
-                ],
-                'service_type': [
-                    'service', 'service_type', 'service_level', 'service type',
-                    'service level', 'shipping service', 'delivery service'
-                ],
-                'cost': [
-                    'cost', 'freight_cost', 'shipping_cost', 'carrier_charge', 
-                    'total_cost', 'total cost', 'freight cost', 'shipping cost',
-                    'carrier cost', 'transport cost', 'delivery cost'
-                ],
-                'billable_amount': [
-                    'billable', 'billable_amount', 'revenue', 'charge_amount', 
-                    'bill_amount', 'invoice_amount', 'billable amount', 'bill amount',
-                    'invoice amount', 'charge amount', 'total billable', 'total_billable'
-                ],
-                'weight': [
-                    'weight', 'package_weight', 'total_weight', 'package weight',
-                    'total weight', 'shipment weight', 'gross weight'
-                ],
-                'zone': [
-                    'zone', 'delivery_zone', 'shipping_zone', 'delivery zone',
-                    'shipping zone', 'service zone'
-                ],
-                'ship_date': [
-                    'date', 'ship_date', 'pickup_date', 'service_date', 'ship date',
-                    'pickup date', 'service date', 'shipment date', 'send date'
-                ],
-                'delivery_date': [
-                    'delivery_date', 'delivered_date', 'delivery', 'delivery date',
-                    'delivered date', 'arrival date', 'completion date'
-                ]
-            }
-            
-            column_map = {}
-            df_columns_lower = {col: col.lower().strip().replace(' ', '').replace('_', '') for col in df.columns}
-            
-            for standard, variants in standard_columns.items():
-                for original_col, clean_col in df_columns_lower.items():
-                    clean_variants = [v.lower().replace(' ', '').replace('_', '') for v in variants]
-                    if clean_col in clean_variants:
-                        column_map[original_col] = standard
-                        break
+            error, existing_count = self._existing_data_error(carrier_name, cycle_period, replace_existing)
+            if error:
+                return False, error
             
-            df = df.rename(columns=column_map)
-            
-            # Verify required columns
-            required_cols = ['client', 'cost', 'billable_amount']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                available_cols = list(df.columns)
-                return False, f"Missing required columns: {missing_cols}. Available columns: {available_cols}"
-            
-            # Create standardized DataFrame
-            STANDARD_COLUMNS = [
-                'carrier', 'client', 'tracking_number', 'service_type', 
-                'cost', 'billable_amount', 'weight', 'zone', 
-                'ship_date', 'delivery_date', 'invoice_status', 
-                'invoice_number', 'invoice_date', 'cycle_period', 
-                'upload_timestamp', 'file_hash'
-            ]
-            
-            standardized_data = []
-            
-            for index, row in df.iterrows():
-                standard_row = {
-                    'carrier': carrier_name,
-                    'client': str(row.get('client', '')).strip(),
-                    'tracking_number': str(row.get('tracking_number', '')).strip(),
-                    'service_type': str(row.get('service_type', '')).strip(),
-                    'cost': pd.to_numeric(row.get('cost', 0), errors='coerce'),
-                    'billable_amount': pd.to_numeric(row.get('billable_amount', 0), errors='coerce'),
-                    'weight': pd.to_numeric(row.get('weight'), errors='coerce'),
-                    'zone': str(row.get('zone', '')).strip(),
-                    'ship_date': pd.to_datetime(row.get('ship_date'), errors='coerce'),
-                    'delivery_date': pd.to_datetime(row.get('delivery_date'), errors='coerce'),
-                    'invoice_status': 'Ready to Bill',
-                    'invoice_number': '',
-                    'invoice_date': pd.to_datetime(row.get('invoice_date'), errors='coerce'),
-                    'cycle_period': cycle_period,
-                    'upload_timestamp': datetime.now(),
-                    'file_hash': file_hash
-                }
-                standardized_data.append(standard_row)
-            
-            standardized_df = pd.DataFrame(standardized_data, columns=STANDARD_COLUMNS)
-            
-            # Remove rows with missing critical data
-            initial_count = len(standardized_df)
-            standardized_df = standardized_df.dropna(subset=['cost', 'billable_amount'])
-            standardized_df = standardized_df[
-                (standardized_df['cost'] != 0) | (standardized_df['billable_amount'] != 0)
-            ]
-            final_count = len(standardized_df)
-            
-            if final_count == 0:
-                return False, "No valid records found with both costs and billable amount data."
-            
-            # Handle existing data
-            existing_shipments = self.load_shipment_data()
-            
-            if not existing_shipments.empty:
-                existing_standardized = pd.DataFrame(columns=STANDARD_COLUMNS)
-                
-                for col in STANDARD_COLUMNS:
-                    if col in existing_shipments.columns:
-                        existing_standardized[col] = existing_shipments[col]
-                    else:
-                        if col in ['ship_date', 'delivery_date', 'invoice_date']:
-                            existing_standardized[col] = pd.NaT
-                        elif col in ['cost', 'billable_amount', 'weight']:
-                            existing_standardized[col] = 0
-                        else:
-                            existing_standardized[col] = ''
-                
-                combined_shipments = pd.concat([existing_standardized, standardized_df], ignore_index=True)
-            else:
-                combined_shipments = standardized_df
-            
-            self.save_shipment_data(combined_shipments)
-            
-            # Update upload log with source path
-            upload_log = self.load_upload_log()
-            
-            new_log_entry = pd.DataFrame([{
-                'filename': file_path.name,
-                'file_hash': file_hash,
-                'upload_date': datetime.now(),
-                'records_imported': final_count,
-                'carrier': carrier_name,
-                'cycle_period': cycle_period,
-                'status': 'Active',
-                'deleted_date': None,
-                'source_path': str(file_path)
-            }])
-            
-            if not upload_log.empty:
-                if 'status' not in upload_log.columns:
-                    upload_log['status'] = 'Active'
-                if 'deleted_date' not in upload_log.columns:
-                    upload_log['deleted_date'] = None
-                if 'source_path' not in upload_log.columns:
-                    upload_log['source_path'] = None
-            
-            combined_log = pd.concat([upload_log, new_log_entry], ignore_index=True)
-            self.save_upload_log(combined_log)
-            
-            # Update billing checklist
-            self.update_billing_checklist(standardized_df)
-            
-            # Mark file as processed
-            if str(file_path) not in self.config.get('processed_files', []):
-                if 'processed_files' not in self.config:
-                    self.config['processed_files'] = []
-                self.config['processed_files'].append(str(file_path))
-                self.save_config()
-            
-            message = f"Successfully {'replaced' if replace_existing and has_existing else 'imported'} {final_count:,} shipments for {carrier_name} ({file_size_mb:.1f} MB)"
-            if replace_existing and has_existing:
-                message += f" (replaced {existing_count:,} existing records)"
-            if initial_count != final_count:
-                message += f" (removed {initial_count - final_count:,} records with missing data)"
-            
-            return True, message
+            read_result = self._read_carrier_file(file_path)
+            return self._ingest_carrier_file(file_path, carrier_name, cycle_period, existing_count, read_result)
             
         except Exception as e:
             import traceback
             traceback.print_exc()
             return False, f"Error processing file: {str(e)}"
     
+    def process_files_from_paths(self, files, replace_existing=False, max_workers=4):
+        """
+        Process several (file_path, carrier_name, cycle_period) files, yielding
+        (success, message) for each in order. Files are read and parsed on a
+        thread pool a few ahead of the one being ingested; ingesting stays on
+        the calling thread because it rewrites the shared checklist, upload
+        log and config.
+        """
+        def ingest(file_path, carrier_name, cycle_period, future):
+            try:
+                read_result = future.result()
+                
+                # Checked at ingest time so earlier files in the batch count
+                error, existing_count = self._existing_data_error(carrier_name, cycle_period, replace_existing)
+                if error:
+                    return False, error
+                
+                return self._ingest_carrier_file(file_path, carrier_name, cycle_period, existing_count, read_result)
+            except FileNotFoundError:
+                return False, f"File not found: {file_path}"
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                return False, f"Error processing file: {str(e)}"
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = collections.deque()
+            for file_path, carrier_name, cycle_period in files:
+                file_path = Path(file_path)
+                pending.append((file_path, carrier_name, cycle_period,
+                                executor.submit(self._read_carrier_file, file_path)))
+                # Keep at most max_workers parsed files waiting in memory
+                if len(pending) >= max_workers:
+                    yield ingest(*pending.popleft())
+            
+            while pending:
+                yield ingest(*pending.popleft())
+    
+    @synchronized
     def mark_file_as_processed(self, file_path):
         """Mark a file as processed without actually processing it"""
-        if str(file_path) not in self.config.get('processed_files', []):
-            if 'processed_files' not in self.config:
-                self.config['processed_files'] = []
-            self.config['processed_files'].append(str(file_path))
-            self.save_config()
-    
+        if str(file_path) not in self.config['processed_files']:
+            # Replaced rather than updated in place, so readers iterating the
+            # old set (e.g. the Settings page) never see it change
+            self.config['processed_files'] = self.config['processed_files'] | {str(file_path)}
+            with open(self.processed_files_journal, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(str(file_path)) + '\n')
+            self._processed_cache = None
+    
+    @synchronized
     def unmark_file_as_processed(self, file_path):
         """Remove a file from the processed list"""
-        if 'processed_files' in self.config:
-            try:
-                self.config['processed_files'].remove(str(file_path))
-                self.save_config()
-            except ValueError:
-                pass
+        if str(file_path) in self.config['processed_files']:
+            self.config['processed_files'] = self.config['processed_files'] - {str(file_path)}
+            self._write_processed_journal()
     
     def get_file_hash(self, file_content):
         """Generate hash for uploaded file to prevent duplicates"""
-        return hashlib.md5(file_content).hexdigest()
+        return xxhash.xxh3_128(file_content).hexdigest()
+    
+    @synchronized
+    def _load_cached(self, path, loader, columns=None, filter=None):
+        """
+        Return a copy of the DataFrame produced by loader for path.
+        Results are cached per column selection and filter expression by the
+        file's (st_mtime_ns, st_size), or those of every file in a dataset
+        directory, so data is only re-read after it changes on disk; save_*
+        methods also drop the entries.
+        """
+        file_key = self._stat_key(path)
+        cache_key = (path, tuple(columns) if columns else None, str(filter) if filter is not None else None)
+        return self._cached(cache_key, file_key, loader).copy()
+    
+    @synchronized
+    def _derived_cached(self, path, name, compute, *args):
+        """
+        Return a copy of compute(*args), a DataFrame (or dict) derived from
+        the data at path. Cached like _load_cached, so Streamlit reruns reuse the result
+        until the underlying file changes. Arrow tables are immutable and are
+        returned without copying.
+        """
+        try:
+            file_key = self._stat_key(path)
+        except OSError:
+            return compute(*args)
+        result = self._cached((path, name) + args, file_key, lambda: compute(*args))
+        
+        if isinstance(result, pa.Table):
+            return result
+        return result.copy()
+    
+    def _cached(self, cache_key, file_key, compute):
+        """
+        Look up cache_key in the LRU _df_cache, calling compute() when the entry
+        is missing or was built from a different file_key. Least recently used
+        entries are evicted once the cache holds more than DF_CACHE_BYTES.
+        """
+        cached = self._df_cache.get(cache_key)
+        if cached is not None and cached[0] != file_key:
+            # Dropped before recomputing, since compute() may evict entries itself
+            self._drop_cache_entry(cache_key)
+            cached = None
+        if cached is None:
+            value = compute()
+            cached = (file_key, value, self._cache_nbytes(value))
+            self._df_cache[cache_key] = cached
+            self._df_cache_bytes += cached[2]
+        self._df_cache.move_to_end(cache_key)
+        
+        # The entry just used is always kept, even when it alone exceeds the budget
+        while self._df_cache_bytes > self.DF_CACHE_BYTES and len(self._df_cache) > 1:
+            self._drop_cache_entry(next(iter(self._df_cache)))
+        return cached[1]
+    
+    def _drop_cache_entry(self, cache_key):
+        """Remove one _df_cache entry and its size from the running total"""
+        self._df_cache_bytes -= self._df_cache.pop(cache_key)[2]
+    
+    @classmethod
+    def _cache_nbytes(cls, value):
+        """Estimated memory of a cached DataFrame, Series, Arrow table or dict of them"""
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return int(np.sum(value.memory_usage(deep=True)))
+        if isinstance(value, pa.Table):
+            return value.nbytes
+        if isinstance(value, dict):
+            return sum(cls._cache_nbytes(item) for item in value.values())
+        return 0
+    
+    def _stat_key(self, path):
+        """Change-detection key for a data file or a Parquet dataset directory"""
+        if path.is_dir():
+            return tuple(sorted(
+                (str(part), part.stat().st_mtime_ns, part.stat().st_size)
+                for part in path.rglob('*.parquet')
+            ))
+        stat = path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    @synchronized
+    def _invalidate_cache(self, path):
+        """Drop all cached DataFrames loaded from path"""
+        for cache_key in [key for key in self._df_cache if key[0] == path]:
+            self._drop_cache_entry(cache_key)
+    
+    def _shipment_dataset(self):
+        """Open the partitioned shipment dataset"""
+        return ds.dataset(
+            self.shipment_data_dir,
+            schema=self.SHIPMENT_SCHEMA,
+            format='parquet',
+            partitioning=self.SHIPMENT_PARTITIONING
+        )
     
-    def load_shipment_data(self):
-        """Load shipment data from Excel"""
+    def load_shipment_data(self, columns=None, filter=None):
+        """
+        Load shipment data from the Parquet dataset, optionally reading only some
+        columns. A pyarrow filter expression (e.g. ds.field('carrier') == name)
+        is pushed down so only matching partitions are read.
+        """
+        def read_shipments():
+            shipments = self._shipment_dataset().to_table(columns=columns, filter=filter).to_pandas()
+            return shipments.astype(
+                {col: dtype for col, dtype in self.SHIPMENT_DTYPES.items() if col in shipments.columns}
+            )
+        
         try:
-            return pd.read_excel(self.shipment_data_file)
+            return self._load_cached(self.shipment_data_dir, read_shipments, columns, filter)
         except:
             return pd.DataFrame()
     
     def load_billing_checklist(self):
-        """Load billing checklist from Excel"""
+        """Load billing checklist from Parquet"""
         try:
-            return pd.read_excel(self.billing_checklist_file)
+            return self._load_cached(
+                self.billing_checklist_file,
+                lambda: pd.read_parquet(self.billing_checklist_file)
+            )
         except:
             return pd.DataFrame()
     
     def load_upload_log(self):
-        """Load upload log from Excel"""
+        """Load upload log from Parquet, adding columns missing from older logs"""
+        def read_upload_log():
+            upload_log = pd.read_parquet(self.upload_log_file)
+            return upload_log.reindex(columns=self.UPLOAD_LOG_COLUMNS).fillna(self.UPLOAD_LOG_DEFAULTS)
+        
         try:
-            return pd.read_excel(self.upload_log_file)
+            return self._load_cached(self.upload_log_file, read_upload_log)
         except:
             return pd.DataFrame()
     
+    def _conform_shipments(self, df):
+        """Force shipment rows into the standard column structure and types of SHIPMENT_SCHEMA"""
+        # reindex reuses existing column data and adds missing columns as all-NaN in one step
+        conformed = df.reindex(columns=self.SHIPMENT_SCHEMA.names)
+        
+        for field in self.SHIPMENT_SCHEMA:
+            col = field.name
+            values = conformed[col]
+            
+            # Only coerce columns that were just added or don't already have the target type
+            if pa.types.is_timestamp(field.type):
+                if not pd.api.types.is_datetime64_any_dtype(values):
+                    conformed[col] = pd.to_datetime(values, errors='coerce')
+            elif pa.types.is_floating(field.type):
+                if col not in df.columns:
+                    conformed[col] = 0.0
+                elif not pd.api.types.is_float_dtype(values):
+                    conformed[col] = pd.to_numeric(values, errors='coerce')
+            else:
+                if col not in df.columns:
+                    conformed[col] = ''
+                elif not pd.api.types.is_string_dtype(values):
+                    conformed[col] = values.astype('string')
+        
+        return conformed
+    
+    def _write_shipment_partitions(self, df, base_dir):
+        """Write shipment rows as new files under base_dir, one directory per carrier/cycle_period"""
+        table = pa.Table.from_pandas(
+            self._conform_shipments(df), schema=self.SHIPMENT_SCHEMA, preserve_index=False
+        )
+        ds.write_dataset(
+            table,
+            base_dir,
+            format='parquet',
+            partitioning=self.SHIPMENT_PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            file_options=ds.ParquetFileFormat().make_write_options(compression='zstd')
+        )
+    
+    @synchronized
+    def append_shipment_data(self, df):
+        """Append new shipments to the dataset without rewriting existing partitions"""
+        if df.empty:
+            return
+        self._write_shipment_partitions(df, self.shipment_data_dir)
+        self._invalidate_cache(self.shipment_data_dir)
+    
+    @synchronized
     def save_shipment_data(self, df):
-        """Save shipment data to Excel"""
-        df.to_excel(self.shipment_data_file, index=False)
+        """Replace the whole shipment dataset with df"""
+        # Write next to the live dataset and swap it in once complete
+        staging_dir = self.shipment_data_dir.with_name(self.shipment_data_dir.name + '.tmp')
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        staging_dir.mkdir()
+        if not df.empty:
+            self._write_shipment_partitions(df, staging_dir)
+        
+        shutil.rmtree(self.shipment_data_dir, ignore_errors=True)
+        staging_dir.rename(self.shipment_data_dir)
+        self._invalidate_cache(self.shipment_data_dir)
+    
+    def _partition_files(self, partition_filter):
+        """Paths of the dataset files in the partitions matched by a carrier/cycle_period filter"""
+        return [Path(fragment.path) for fragment in self._shipment_dataset().get_fragments(filter=partition_filter)]
+    
+    def _remove_shipment_files(self, files):
+        """Delete dataset files, dropping partition directories left empty"""
+        for fragment_path in files:
+            fragment_path.unlink()
+            
+            # Drop the cycle_period and carrier directories once they are empty
+            for partition_dir in (fragment_path.parent, fragment_path.parent.parent):
+                if partition_dir != self.shipment_data_dir and not any(partition_dir.iterdir()):
+                    partition_dir.rmdir()
+    
+    @synchronized
+    def _delete_shipment_partition(self, carrier_name, cycle_period):
+        """Delete the files of one carrier/cycle_period partition"""
+        partition_filter = (ds.field('carrier') == carrier_name) & (ds.field('cycle_period') == cycle_period)
+        self._remove_shipment_files(self._partition_files(partition_filter))
+        self._invalidate_cache(self.shipment_data_dir)
+    
+    @synchronized
+    def _replace_shipment_partitions(self, partition_filter, df):
+        """
+        Rewrite the partitions matched by partition_filter so they hold exactly
+        the rows of df. New files are written before the old ones are removed.
+        """
+        old_files = self._partition_files(partition_filter)
+        if not df.empty:
+            self._write_shipment_partitions(df, self.shipment_data_dir)
+        self._remove_shipment_files(old_files)
+        self._invalidate_cache(self.shipment_data_dir)
     
+    @synchronized
     def save_billing_checklist(self, df):
-        """Save billing checklist to Excel"""
-        df.to_excel(self.billing_checklist_file, index=False)
-    
+        """Save billing checklist to Parquet"""
+        # Text columns can hold mixed str/number values (e.g. migrated from Excel),
+        # which Arrow can't store in one column
+        text_columns = ['client', 'carrier', 'cycle_period', 'invoice_status',
+                        'invoice_number', 'invoice number', 'notes']
+        df = df.astype({col: 'string' for col in text_columns if col in df.columns})
+        # Counts are stored as uint32 rather than the float64 they widen to in merges
+        if 'shipment_count' in df.columns and df['shipment_count'].notna().all():
+            df = df.astype({'shipment_count': 'uint32'})
+        df.to_parquet(self.billing_checklist_file, index=False, engine='pyarrow', compression='zstd')
+        self._invalidate_cache(self.billing_checklist_file)
+    
+    @synchronized
     def save_upload_log(self, df):
-        """Save upload log to Excel"""
-        df.to_excel(self.upload_log_file, index=False)
+        """Save upload log to Parquet"""
+        df.to_parquet(self.upload_log_file, index=False, engine='pyarrow', compression='zstd')
+        self._invalidate_cache(self.upload_log_file)
+        self._processed_cache = None
     
+    @synchronized
     def check_existing_data(self, carrier_name, cycle_period):
         """Check if data already exists for this carrier/cycle combination"""
-        existing_shipments = self.load_shipment_data()
-        if existing_shipments.empty:
-            return False, 0
-        
-        existing_data = existing_shipments[
-            (existing_shipments['carrier'] == carrier_name) & 
-            (existing_shipments['cycle_period'] == cycle_period)
-        ]
+        # Count rows from the matching partition's Parquet metadata without materializing them
+        existing_count = self._shipment_dataset().count_rows(
+            filter=(ds.field('carrier') == carrier_name) & (ds.field('cycle_period') == cycle_period)
+        )
         
-        return not existing_data.empty, len(existing_data)
+        return existing_count > 0, existing_count
     
-    def remove_existing_data(self, carrier_name, cycle_period):
-        """Remove existing data for carrier/cycle before adding new data"""
-        # Remove from shipment data
-        shipment_data = self.load_shipment_data()
-        if not shipment_data.empty:
-            updated_shipments = shipment_data[
-                ~((shipment_data['carrier'] == carrier_name) & 
-                  (shipment_data['cycle_period'] == cycle_period))
-            ]
-            self.save_shipment_data(updated_shipments)
+    @synchronized
+    def remove_existing_data(self, carrier_name, cycle_period, replacement=None):
+        """
+        Remove existing data for carrier/cycle before adding new data.
+        If replacement shipments are given they are written into the partition
+        before its old files are dropped.
+        """
+        # Remove (or swap out) the carrier/cycle partition from shipment data
+        if replacement is None:
+            self._delete_shipment_partition(carrier_name, cycle_period)
+        else:
+            self._replace_shipment_partitions(
+                (ds.field('carrier') == carrier_name) & (ds.field('cycle_period') == cycle_period),
+                replacement
+            )
         
         # Remove from billing checklist
         checklist = self.load_billing_checklist()
@@ -560,251 +976,214 @@ class FreightBillingChecker:
             if has_existing and not replace_existing:
                 return False, f"Data already exists for {carrier_name} - {cycle_period} ({existing_count:,} records). Use 'Replace Existing Data' option to update."
         
-            # Check file size
-            file_size_mb = len(file.getvalue()) / (1024 * 1024)
-        
-            # Remove existing data if replacing
-            if replace_existing and has_existing:
-                self.remove_existing_data(carrier_name, cycle_period)
+            # Copy the upload's bytes once for both the size check and the hash
+            file_bytes = file.getvalue()
+            file_size_mb = len(file_bytes) / (1024 * 1024)
+            file_hash = self.get_file_hash(file_bytes)
 
-            # Read file with better error handling
+            # Parse from those bytes, independent of where a preview left the upload's position
             if file.name.endswith('.xlsx'):
-                df = pd.read_excel(file, engine='openpyxl')
+                df = read_excel(io.BytesIO(file_bytes))
             elif file.name.endswith('.csv'):
-                if file_size_mb > 10:
-                    chunk_list = []
-                    chunk_size = 10000
-                    for chunk in pd.read_csv(file, chunksize=chunk_size):
-                        chunk_list.append(chunk)
-                    df = pd.concat(chunk_list, ignore_index=True)
-                else:
-                    df = pd.read_csv(file)
+                df = read_csv(io.BytesIO(file_bytes))
             else:
                 return False, "Unsupported file format. Please use Excel or CSV."
-
-            print(f"Raw file shape: {df.shape}")
-
-            # Clean up DataFrame - remove empty columns and rows
-            df = df.dropna(axis=1, how='all')  # Remove completely empty columns
-            df = df.dropna(axis=0, how='all')  # Remove completely empty rows
-        
-            # Remove columns that are mostly empty (>95% null)
-            null_threshold = 0.95
-            null_percentages = df.isnull().mean()
-            cols_to_keep = null_percentages[null_percentages < null_threshold].index
-            df = df[cols_to_keep]
-        
-            print(f"After cleaning: {df.shape}")
-        
-            # Standardize columns with manual mapping if provided
-            if column_mapping:
-                df = df.rename(columns=column_mapping)
-        
-            # Auto-detect columns (your existing logic but more robust)
-            standard_columns = {
-                'client': [
-                    'client', 'customer', 'customer_name', 'account', 'consignee', 
-                    'shipper', 'company', 'client_name', 'customer name', 'account name'
-                ],
-                'tracking_number': [
-                    'tracking', 'tracking_number', 'tracking_id', 'awb', 'pro', 
-                    'tracking number', 'tracking id', 'shipment id', 'reference'
-                ],
-                'service_type': [
-                    'service', 'service_type', 'service_level', 'service type',
-                    'service level', 'shipping service', 'delivery service'
-                ],
-                'cost': [
-                    'cost', 'freight_cost', 'shipping_cost', 'carrier_charge', 
-                    'total_cost', 'total cost', 'freight cost', 'shipping cost',
-                    'carrier cost', 'transport cost', 'delivery cost'
-                ],
-                'billable_amount': [
-                    'billable', 'billable_amount', 'revenue', 'charge_amount', 
-                    'bill_amount', 'invoice_amount', 'billable amount', 'bill amount',
-                '   invoice amount', 'charge amount', 'total billable', 'total_billable'
-                ],
-                'weight': [
-                    'weight', 'package_weight', 'total_weight', 'package weight',
-                    'total weight', 'shipment weight', 'gross weight'
-                ],
-                'zone': [
-                    'zone', 'delivery_zone', 'shipping_zone', 'delivery zone',
-                    'shipping zone', 'service zone'
-                ],
-                'ship_date': [
-                    'date', 'ship_date', 'pickup_date', 'service_date', 'ship date',
-                    'pickup date', 'service date', 'shipment date', 'send date'
-                ],
-                'delivery_date': [
-                    'delivery_date', 'delivered_date', 'delivery', 'delivery date',
-                    'delivered date', 'arrival date', 'completion date'
-                ]
-            }
-
-            # Auto-detect columns with better matching
-            column_map = {}
-            df_columns_lower = {col: col.lower().strip().replace(' ', '').replace('_', '') for col in df.columns}
-        
-            for standard, variants in standard_columns.items():
-                for original_col, clean_col in df_columns_lower.items():
-                    clean_variants = [v.lower().replace(' ', '').replace('_', '') for v in variants]
-                    if clean_col in clean_variants:
-                        column_map[original_col] = standard
-                        break
-
-            # Apply column mapping
-            df = df.rename(columns=column_map)
-
-            print(f'"Columns after auto-detection: {list(df.columns)}")')
-
-            # Verify required columns exist
-            required_cols = ['client', 'cost', 'billable_amount']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                available_cols = list(df.columns)
-                return False, f"Missing required columns: {missing_cols}. Available columns: {available_cols}"
-
-            # CREATE STANDARDIZED DATAFRAME
-            # Define our exact standard structure (16 columns)
-            STANDARD_COLUMNS = [
-                'carrier', 'client', 'tracking_number', 'service_type', 
-                'cost', 'billable_amount', 'weight', 'zone', 
-                'ship_date', 'delivery_date', 'invoice_status', 
-                'invoice_number', 'invoice_date', 'cycle_period', 
-                'upload_timestamp', 'file_hash'
-            ]
-        
-            # Build standardized DataFrame
-            standardized_data = []
-
-            for index, row in df.iterrows():
-                standard_row = {
-                    'carrier': carrier_name,
-                    'client': str(row.get('client', '')).strip(),
-                    'tracking_number': str(row.get('tracking_number', '')).strip(),
-                    'service_type': str(row.get('service_type', '')).strip(),
-                    'cost': pd.to_numeric(row.get('cost', 0), errors='coerce'),
-                    'billable_amount': pd.to_numeric(row.get('billable_amount', 0), errors='coerce'),
-                    'weight': pd.to_numeric(row.get('weight'), errors='coerce'),
-                    'zone': str(row.get('zone', '')).strip(),
-                    'ship_date': pd.to_datetime(row.get('ship_date'), errors='coerce'),
-                    'delivery_date': pd.to_datetime(row.get('delivery_date'), errors='coerce'),
-                    'invoice_status': 'Ready to Bill',
-                    'invoice_number': '',
-                    'invoice_date': pd.to_datetime(row.get('invoice_date'), errors='coerce'),
-                    'cycle_period': cycle_period,
-                    'upload_timestamp': datetime.now(),
-                    'file_hash': self.get_file_hash(file.getvalue())
-                }
-                standardized_data.append(standard_row)
-
-            # Create standardized DataFrame with exact column structure
-            standardized_df = pd.DataFrame(standardized_data, columns=STANDARD_COLUMNS)
-        
-            # Remove rows with missing critical data
-            initial_count = len(standardized_df)
-            standardized_df = standardized_df.dropna(subset=['cost', 'billable_amount'])
-            standardized_df = standardized_df[
-                (standardized_df['cost'] != 0) | (standardized_df['billable_amount'] != 0)
-            ]
-            final_count = len(standardized_df)
-
-            if final_count == 0:
-                return False, "No valid records found with both costs and billable amount data."
-
-            print(f"Standardised DataFrame: {standardized_df.shape}")
-
-            # Handle existing data with structure enforcement
-            existing_shipments = self.load_shipment_data()
-        
-            if not existing_shipments.empty:
-                print(f"Existing data before standardization: {existing_shipments.shape}")
-            
-                # Force existing data into standard structure
-                existing_standardized = pd.DataFrame(columns=STANDARD_COLUMNS)
-            
-            for col in STANDARD_COLUMNS:
-                if col in existing_shipments.columns:
-                    existing_standardized[col] = existing_shipments[col]
-                else:
-                    # Add missing columns with appropriate defaults
-                    if col in ['ship_date', 'delivery_date', 'invoice_date']:
-                        existing_standardized[col] = pd.NaT
-                    elif col in ['cost', 'billable_amount', 'weight']:
-                        existing_standardized[col] = 0
-                    else:
-                        existing_standardized[col] = ''
             
-                print(f"Existing data after standardization: {existing_standardized.shape}")
-            
-                # Safe concatenation with identical structures
-                combined_shipments = pd.concat([existing_standardized, standardized_df], ignore_index=True)
-            else:
-                combined_shipments = standardized_df
+            return self._ingest_dataframe(
+                df, carrier_name, cycle_period,
+                file_hash=file_hash,
+                filename=file.name,
+                source_path=None,
+                file_size_mb=file_size_mb,
+                existing_count=existing_count if replace_existing else 0,
+                column_mapping=column_mapping
+            )
+        
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return False, f"Error processing file: {str(e)}"
+    
+    @synchronized
+    def _ingest_dataframe(self, df, carrier_name, cycle_period, file_hash, filename,
+                          source_path, file_size_mb, existing_count=0, column_mapping=None):
+        """
+        Clean, standardize and store a carrier file read by process_file_from_path
+        or process_carrier_file, then log the upload and update the billing checklist.
+        existing_count > 0 replaces that many existing carrier/cycle records.
+        """
+        # Clean up DataFrame
+        df = df.dropna(axis=1, how='all')
+        df = df.dropna(axis=0, how='all')
+        
+        # Remove columns that are mostly empty (>95% null)
+        # df.count() tallies non-null cells per column without building a boolean mask frame
+        null_threshold = 0.95
+        df = df.loc[:, df.count() > (1 - null_threshold) * len(df)]
+        
+        # Standardize columns with manual mapping if provided
+        if column_mapping:
+            df = df.rename(columns=column_mapping)
+        
+        # Auto-detect columns with one lookup per column in the precomputed variant map
+        column_map = {}
+        for original_col in df.columns:
+            standard = self._variant_map.get(original_col.lower().strip().replace(' ', '').replace('_', ''))
+            # First matching column wins for each standard column
+            if standard and standard not in column_map.values():
+                column_map[original_col] = standard
+        
+        df = df.rename(columns=column_map)
+        
+        # Verify required columns
+        required_cols = ['client', 'cost', 'billable_amount']
+        missing_cols = [col for col in required_cols if col not in df.columns]
+        if missing_cols:
+            available_cols = list(df.columns)
+            return False, f"Missing required columns: {missing_cols}. Available columns: {available_cols}"
+        
+        # Create standardized DataFrame
+        STANDARD_COLUMNS = [
+            'carrier', 'client', 'tracking_number', 'service_type', 
+            'cost', 'billable_amount', 'weight', 'zone', 
+            'ship_date', 'delivery_date', 'invoice_status', 
+            'invoice_number', 'invoice_date', 'cycle_period', 
+            'upload_timestamp', 'file_hash'
+        ]
         
-            print(f"Final combined shape: {combined_shipments.shape}")
+        # Build each column with one vectorized call instead of a per-row loop.
+        # Text goes through Arrow-backed strings so the trim runs as an Arrow
+        # compute kernel (CSV columns arrive Arrow-backed already)
+        def text_column(col):
+            if col not in df.columns:
+                return pd.NA
+            values = df[col].astype('string[pyarrow]').str.strip()
+            # Missing and blank cells stay NA instead of becoming a '' value
+            return values.mask(values == '')
+        
+        def numeric_column(col):
+            if col in df.columns:
+                return pd.to_numeric(df[col], errors='coerce')
+            return float('nan')
+        
+        def date_column(col):
+            if col not in df.columns:
+                return pd.NaT
+            values = df[col]
+            if pd.api.types.is_unsigned_integer_dtype(values):
+                # Unsigned epochs take a much slower conversion path than int64
+                values = values.astype('int64')
+            elif values.dtype == object or pd.api.types.is_string_dtype(values):
+                # Try the fixed ISO layout first; cache=True parses each distinct
+                # date string once. Anything else is parsed value by value, since
+                # one format inferred from the first date would drop the others
+                try:
+                    return pd.to_datetime(values, format='ISO8601', cache=True)
+                except (ValueError, TypeError):
+                    return pd.to_datetime(values, format='mixed', errors='coerce', cache=True)
+            return pd.to_datetime(values, errors='coerce', cache=True)
+        
+        # Assemble every column in one constructor call; scalars broadcast over the index
+        standardized_df = pd.DataFrame({
+            'carrier': carrier_name,
+            # Shipments without a client are billed under an explicit placeholder,
+            # so their amounts still reach the checklist and every summary
+            'client': text_column('client').fillna(self.BLANK_CLIENT),
+            'tracking_number': text_column('tracking_number'),
+            'service_type': text_column('service_type'),
+            'cost': numeric_column('cost'),
+            'billable_amount': numeric_column('billable_amount'),
+            'weight': numeric_column('weight'),
+            'zone': text_column('zone'),
+            'ship_date': date_column('ship_date'),
+            'delivery_date': date_column('delivery_date'),
+            'invoice_status': 'Ready to Bill',
+            'invoice_number': '',
+            'invoice_date': date_column('invoice_date'),
+            'cycle_period': cycle_period,
+            'upload_timestamp': datetime.now(),
+            'file_hash': file_hash
+        }, index=df.index, columns=STANDARD_COLUMNS)
+        
+        # Same dtypes as loaded shipments: categorical keys give a smaller frame and
+        # code-based grouping, and later concats with loaded data need no coercion
+        standardized_df = standardized_df.astype(self.SHIPMENT_DTYPES)
+        
+        # Remove rows with missing critical data
+        initial_count = len(standardized_df)
+        standardized_df = standardized_df.dropna(subset=['cost', 'billable_amount'])
+        standardized_df = standardized_df[
+            (standardized_df['cost'] != 0) | (standardized_df['billable_amount'] != 0)
+        ]
+        final_count = len(standardized_df)
         
-            # Save the data
-            self.save_shipment_data(combined_shipments)
+        if final_count == 0:
+            return False, "No valid records found with both costs and billable amount data."
         
-            # Update upload log
-            upload_log = self.load_upload_log()
+        # Replace only once the new file has parsed into valid records; either way
+        # only the new rows are written, never the rest of the dataset
+        if existing_count:
+            self.remove_existing_data(carrier_name, cycle_period, replacement=standardized_df)
+        else:
+            # Append the new batch as its own partition files
+            self.append_shipment_data(standardized_df)
         
-            new_log_entry = pd.DataFrame([{
-                'filename': file.name,
-                'file_hash': self.get_file_hash(file.getvalue()),
-                'upload_date': datetime.now(),
-                'records_imported': final_count,
-                'carrier': carrier_name,
-                'cycle_period': cycle_period,
-                'status': 'Active',
-                'deleted_date': None,
-                'source_path': None  # Manual upload, no source path
-            }])
-        
-            # Ensure upload log structure consistency
-            if not upload_log.empty:
-                if 'status' not in upload_log.columns:
-                    upload_log['status'] = 'Active'
-                if 'deleted_date' not in upload_log.columns:
-                    upload_log['deleted_date'] = None
-                if 'source_path' not in upload_log.columns:
-                    upload_log['source_path'] = None
+        # Update upload log (manual uploads have no source path)
+        upload_log = self.load_upload_log()
         
-            combined_log = pd.concat([upload_log, new_log_entry], ignore_index=True)
-            self.save_upload_log(combined_log)
+        new_log_entry = pd.DataFrame([{
+            'filename': filename,
+            'file_hash': file_hash,
+            'upload_date': datetime.now(),
+            'records_imported': final_count,
+            'carrier': carrier_name,
+            'cycle_period': cycle_period,
+            'status': 'Active',
+            'deleted_date': None,
+            'source_path': source_path
+        }])
+        
+        if upload_log.empty:
+            combined_log = new_log_entry
+        else:
+            combined_log = pd.concat([upload_log, new_log_entry], ignore_index=True, copy=False)
+        self.save_upload_log(combined_log)
         
-            # Update billing checklist
-            self.update_billing_checklist(standardized_df)
+        # Update billing checklist
+        self.update_billing_checklist(standardized_df)
         
-            message = f"Successfully {'replaced' if replace_existing and has_existing else 'imported'} {final_count:,} shipments for {carrier_name} ({file_size_mb:.1f} MB)"
-            if replace_existing and has_existing:
-                message += f" (replaced {existing_count:,} existing records)"
-            if initial_count != final_count:
-                message += f" (removed {initial_count - final_count:,} records with missing data)"
+        # Mark file as processed
+        if source_path:
+            self.mark_file_as_processed(source_path)
         
-            return True, message
+        message = f"Successfully {'replaced' if existing_count else 'imported'} {final_count:,} shipments for {carrier_name} ({file_size_mb:.1f} MB)"
+        if existing_count:
+            message += f" (replaced {existing_count:,} existing records)"
+        if initial_count != final_count:
+            message += f" (removed {initial_count - final_count:,} records with missing data)"
         
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return False, f"Error processing file: {str(e)}"
+        return True, message
         
+    @synchronized
     def update_billing_checklist(self, new_shipments):
         """Update billing checklist with new shipment data"""
-        # Group by client, carrier, and cycle period
-        summary = new_shipments.groupby(['client', 'carrier', 'cycle_period']).agg({
-            'tracking_number': 'count',
-            'cost': 'sum',
-            'billable_amount': 'sum'
-        }).reset_index()
+        # Group by client, carrier, and cycle period: encode the keys as integer
+        # group codes once, then reduce each measure with a single bincount
+        group_keys = pd.MultiIndex.from_frame(new_shipments[['client', 'carrier', 'cycle_period']])
+        group_codes, groups = group_keys.factorize(sort=True)
+        ngroups = len(groups)
+        
+        summary = groups.to_frame(index=False, name=group_keys.names)
+        summary['shipment_count'] = np.bincount(group_codes, minlength=ngroups)
+        for col in ['cost', 'billable_amount']:
+            summary[col] = np.bincount(
+                group_codes, weights=new_shipments[col].fillna(0).to_numpy(), minlength=ngroups
+            )
         
-        summary.rename(columns={'tracking_number': 'shipment_count'}, inplace=True)
         summary['total_cost'] = summary['cost']
         summary['total_billable'] = summary['billable_amount']
         summary['profit'] = summary['total_billable'] - summary['total_cost']
-        summary['profit_margin'] = (summary['profit'] / summary['total_billable'] * 100).round(2)
+        summary['profit_margin'] = profit_margin(summary['profit'], summary['total_billable'])
         summary['invoice_status'] = 'Ready to Bill'
         summary['invoice number'] = ''
         summary['invoice_date'] = None
@@ -812,58 +1191,121 @@ class FreightBillingChecker:
         
         # Load existing checklist
         existing_checklist = self.load_billing_checklist()
+        keys = ['client', 'carrier', 'cycle_period']
+        totals = ['shipment_count', 'total_cost', 'total_billable']
         
-        for _, row in summary.iterrows():
-            client = row['client']
-            carrier = row['carrier']
-            cycle = row['cycle_period']
+        if existing_checklist.empty:
+            existing_checklist = summary
+        else:
+            # Update existing entries (add to totals) with one key-aligned merge
+            existing_checklist = existing_checklist.merge(
+                summary[keys + totals], on=keys, how='left',
+                suffixes=('', '_new'), validate='many_to_one'
+            )
+            matched = existing_checklist['shipment_count_new'].notna()
+            for col in totals:
+                # Whole-column add (0 for unmatched rows) so the stored uint32 count can widen
+                existing_checklist[col] = existing_checklist[col] + existing_checklist.pop(f'{col}_new').fillna(0)
+            
+            # Recalculate derived fields
+            existing_checklist.loc[matched, 'profit'] = (
+                existing_checklist.loc[matched, 'total_billable'] - 
+                existing_checklist.loc[matched, 'total_cost']
+            )
+            existing_checklist.loc[matched, 'profit_margin'] = profit_margin(
+                existing_checklist.loc[matched, 'profit'],
+                existing_checklist.loc[matched, 'total_billable']
+            )
             
-            # Check if entry exists
-            mask = ((existing_checklist['client'] == client) & 
-                   (existing_checklist['carrier'] == carrier) & 
-                   (existing_checklist['cycle_period'] == cycle))
+            # Summary rows without an existing entry are added as new entries
+            is_new = summary.merge(
+                existing_checklist[keys].drop_duplicates(), on=keys, how='left', indicator=True
+            )['_merge'].eq('left_only').to_numpy()
             
-            if existing_checklist[mask].empty:
-                # Add new entry
-                new_entry = pd.DataFrame([row])
-                existing_checklist = pd.concat([existing_checklist, new_entry], ignore_index=True)
-            else:
-                # Update existing entry (add to totals)
-                for col in ['shipment_count', 'total_cost', 'total_billable']:
-                    existing_checklist.loc[mask, col] = (
-                        existing_checklist.loc[mask, col].iloc[0] + row[col]
-                    )
-                # Recalculate derived fields
-                existing_checklist.loc[mask, 'profit'] = (
-                    existing_checklist.loc[mask, 'total_billable'] - 
-                    existing_checklist.loc[mask, 'total_cost']
-                )
-                existing_checklist.loc[mask, 'profit_margin'] = (
-                    existing_checklist.loc[mask, 'profit'] / 
-                    existing_checklist.loc[mask, 'total_billable'] * 100
-                ).round(2)
+            # Single concat of all new entries; the frames are only read from afterwards
+            existing_checklist = pd.concat(
+                [existing_checklist, summary[is_new]], ignore_index=True, copy=False
+            )
         
         self.save_billing_checklist(existing_checklist)
     
     def get_billing_checklist(self, cycle_period=None, client=None, carrier=None):
         """Get billing checklist for invoice preparation"""
+        return self._derived_cached(
+            self.billing_checklist_file, 'billing_checklist', self._build_billing_checklist,
+            cycle_period, client, carrier
+        )
+    
+    def _build_billing_checklist(self, cycle_period, client, carrier):
+        """Filtered, sorted checklist behind get_billing_checklist"""
         checklist = self.load_billing_checklist()
         
         if checklist.empty:
             return pd.DataFrame()
         
-        # Apply filters
-        if cycle_period:
-            checklist = checklist[checklist['cycle_period'] == cycle_period]
-        if client:
-            checklist = checklist[checklist['client'] == client]
-        if carrier:
-            checklist = checklist[checklist['carrier'] == carrier]
+        # Apply filters as one combined mask so the table is only copied once
+        mask = pd.Series(True, index=checklist.index)
+        for col, value in (('cycle_period', cycle_period), ('client', client), ('carrier', carrier)):
+            if value:
+                mask &= checklist[col] == value
+        if not mask.all():
+            checklist = checklist[mask]
         
+        checklist = self._summary_dtypes(checklist)
         return checklist.sort_values(['cycle_period', 'client', 'carrier'], ascending=[False, True, True])
     
+    def _summary_dtypes(self, df):
+        """
+        Client/carrier/cycle columns as categoricals, so grouping and filtering
+        work on integer codes (cycles are ordered, so max() and sorting follow
+        the period order), and the remaining text as Arrow-backed strings
+        """
+        cycles = pd.CategoricalDtype(sorted(df['cycle_period'].dropna().unique()), ordered=True)
+        dtypes = {'client': 'category', 'carrier': 'category', 'cycle_period': cycles}
+        dtypes.update({
+            col: 'string[pyarrow]' for col in ['invoice_status', 'invoice_number', 'invoice number', 'notes']
+            if col in df.columns
+        })
+        return df.astype(dtypes)
+    
+    def get_filter_options(self):
+        """
+        Distinct cycles (newest first), clients and carriers in the checklist,
+        plus each client's cycles, for the page filter selectboxes
+        """
+        return self._derived_cached(self.billing_checklist_file, 'filter_options', self._build_filter_options)
+    
+    def _build_filter_options(self):
+        """Distinct filter values behind get_filter_options"""
+        checklist = self.load_billing_checklist()
+        
+        if checklist.empty:
+            return {'cycle_period': [], 'client': [], 'carrier': [], 'client_cycles': {}}
+        
+        def distinct(col, reverse=False):
+            return sorted(checklist[col].dropna().unique().tolist(), reverse=reverse)
+        
+        client_cycles = (
+            checklist[['client', 'cycle_period']].dropna().drop_duplicates()
+            .sort_values('cycle_period', ascending=False)
+            .groupby('client', sort=False)['cycle_period'].agg(list)
+        )
+        
+        return {
+            'cycle_period': distinct('cycle_period', reverse=True),
+            'client': distinct('client'),
+            'carrier': distinct('carrier'),
+            'client_cycles': client_cycles.to_dict()
+        }
+    
     def get_client_summary(self, cycle_period=None):
         """Get summary by client (combining all carriers)"""
+        return self._derived_cached(
+            self.billing_checklist_file, 'client_summary', self._build_client_summary, cycle_period
+        )
+    
+    def _build_client_summary(self, cycle_period):
+        """Per-client aggregation behind get_client_summary"""
         checklist = self.load_billing_checklist()
         
         if checklist.empty:
@@ -871,22 +1313,58 @@ class FreightBillingChecker:
         
         if cycle_period:
             checklist = checklist[checklist['cycle_period'] == cycle_period]
+        checklist = self._summary_dtypes(checklist)
         
-        # Group by client and cycle
-        client_summary = checklist.groupby(['client', 'cycle_period']).agg({
+        # Group by client and cycle; a client counts as billed only when every
+        # carrier row is, i.e. the min of the boolean flag is True
+        client_summary = checklist.assign(
+            is_billed=checklist['invoice_status'].eq('Billed').fillna(False).astype(bool)
+        ).groupby(['client', 'cycle_period'], observed=True).agg({
             'shipment_count': 'sum',
             'total_cost': 'sum',
             'total_billable': 'sum',
-            'invoice_status': lambda x: 'Billed' if all(x == 'Billed') else 'Ready to Bill'
+            'is_billed': 'min'
         }).reset_index()
         
+        client_summary.insert(
+            client_summary.columns.get_loc('is_billed'), 'invoice_status',
+            pd.array(np.where(client_summary.pop('is_billed'), 'Billed', 'Ready to Bill'), dtype='string[pyarrow]')
+        )
+        
         client_summary['profit'] = client_summary['total_billable'] - client_summary['total_cost']
-        client_summary['profit_margin'] = (
-            client_summary['profit'] / client_summary['total_billable'] * 100
-        ).round(2)
+        client_summary['profit_margin'] = profit_margin(
+            client_summary['profit'], client_summary['total_billable']
+        )
         
         return client_summary.sort_values(['cycle_period', 'total_billable'], ascending=[False, False])
     
+    def get_dashboard_metrics(self):
+        """
+        Totals, status counts, top clients and the latest cycle's rows for the
+        dashboard, aggregated once per checklist change (empty dict if no data)
+        """
+        return self._derived_cached(self.billing_checklist_file, 'dashboard_metrics', self._build_dashboard_metrics)
+    
+    def _build_dashboard_metrics(self):
+        """Dashboard aggregates behind get_dashboard_metrics"""
+        client_summary = self.get_client_summary()
+        
+        if client_summary.empty:
+            return {}
+        
+        latest_cycle = client_summary['cycle_period'].max()
+        
+        return {
+            'total_billable': client_summary['total_billable'].sum(),
+            'total_cost': client_summary['total_cost'].sum(),
+            'total_profit': client_summary['profit'].sum(),
+            'ready_to_bill': int(client_summary['invoice_status'].eq('Ready to Bill').sum()),
+            'status_counts': client_summary['invoice_status'].value_counts(),
+            'top_clients': client_summary.groupby('client', observed=True)['total_billable'].sum().nlargest(10),
+            'latest_cycle': latest_cycle,
+            'latest_data': client_summary[client_summary['cycle_period'] == latest_cycle]
+        }
+    
     def get_carrier_breakdown(self, client, cycle_period):
         """Get carrier breakdown for specific client/cycle"""
         checklist = self.load_billing_checklist()
@@ -901,23 +1379,23 @@ class FreightBillingChecker:
         
         return breakdown.sort_values('total_billable', ascending=False)
     
-    def get_shipment_details(self, client=None, carrier=None, cycle_period=None):
-        """Get detailed shipment data for line items"""
-        shipment_data = self.load_shipment_data()
+    def get_shipment_details(self, client=None, carrier=None, cycle_period=None, columns=None):
+        """Get detailed shipment data for line items, optionally projected to columns"""
+        # Push the filters down to the dataset so only matching partitions are read
+        shipment_filter = None
+        for col, value in (('client', client), ('carrier', carrier), ('cycle_period', cycle_period)):
+            if value:
+                condition = ds.field(col) == value
+                shipment_filter = condition if shipment_filter is None else shipment_filter & condition
+        
+        shipment_data = self.load_shipment_data(columns=columns, filter=shipment_filter)
         
         if shipment_data.empty:
             return pd.DataFrame()
         
-        # Apply filters
-        if client:
-            shipment_data = shipment_data[shipment_data['client'] == client]
-        if carrier:
-            shipment_data = shipment_data[shipment_data['carrier'] == carrier]
-        if cycle_period:
-            shipment_data = shipment_data[shipment_data['cycle_period'] == cycle_period]
-        
         return shipment_data.sort_values(['client', 'carrier', 'ship_date'])
     
+    @synchronized
     def mark_client_billed(self, client, cycle_period, invoice_number, invoice_date=None, notes=""):
         """Mark entire client as billed (all carriers for that cycle)"""
         if invoice_date is None:
@@ -927,169 +1405,211 @@ class FreightBillingChecker:
         checklist = self.load_billing_checklist()
         mask = (checklist['client'] == client) & (checklist['cycle_period'] == cycle_period)
         
-        if not checklist[mask].empty:
-            checklist.loc[mask, 'invoice_status'] = 'Billed'
-            checklist.loc[mask, 'invoice_number'] = invoice_number
-            checklist.loc[mask, 'invoice_date'] = invoice_date
-            checklist.loc[mask, 'notes'] = notes
+        billed_values = {
+            'invoice_status': 'Billed',
+            'invoice_number': invoice_number,
+            'invoice_date': invoice_date
+        }
+        
+        if mask.any():
+            checklist_values = {**billed_values, 'notes': notes}
+            checklist.loc[mask, list(checklist_values)] = list(checklist_values.values())
             
             self.save_billing_checklist(checklist)
         
-        # Update shipment data
-        shipment_data = self.load_shipment_data()
+        # Update shipment data, reading and rewriting only the cycle's partitions
+        cycle_filter = ds.field('cycle_period') == cycle_period
+        shipment_data = self.load_shipment_data(filter=cycle_filter)
         mask = (shipment_data['client'] == client) & (shipment_data['cycle_period'] == cycle_period)
         
-        if not shipment_data[mask].empty:
-            shipment_data.loc[mask, 'invoice_status'] = 'Billed'
-            shipment_data.loc[mask, 'invoice_number'] = invoice_number
-            shipment_data.loc[mask, 'invoice_date'] = invoice_date
+        if mask.any():
+            # invoice_status is categorical, so 'Billed' has to be a known category first
+            if 'Billed' not in shipment_data['invoice_status'].cat.categories:
+                shipment_data['invoice_status'] = shipment_data['invoice_status'].cat.add_categories('Billed')
+            shipment_values = {**billed_values, 'invoice_date': pd.Timestamp(invoice_date)}
+            shipment_data.loc[mask, list(shipment_values)] = list(shipment_values.values())
             
-            self.save_shipment_data(shipment_data)
+            self._replace_shipment_partitions(cycle_filter, shipment_data)
         
         return True
     
-    def export_billing_data(self, cycle_period=None, client=None):
-        """Export billing data for invoice preparation"""
+    def export_billing_data(self, cycle_period=None, client=None, file_format='parquet'):
+        """
+        Export billing data for invoice preparation, as a zip of Parquet files
+        (one per sheet) or, with file_format='xlsx', as an Excel workbook
+        """
         client_summary = self.get_client_summary(cycle_period)
         detailed_checklist = self.get_billing_checklist(cycle_period, client)
-        shipment_details = self.get_shipment_details(client, cycle_period=cycle_period)
+        # Project to the invoicing columns at read time rather than after loading everything
+        shipment_details = self.get_shipment_details(client, cycle_period=cycle_period, columns=[
+            'client', 'carrier', 'tracking_number', 'service_type', 
+            'ship_date', 'cost', 'billable_amount', 'cycle_period'
+        ])
+        
+        # Client summary (main invoicing reference) and detailed breakdown by carrier
+        sheets = [
+            ('Client_Invoice_Totals', client_summary),
+            ('Carrier_Breakdown', detailed_checklist)
+        ]
         
-        # Create Excel file in memory
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Client summary (main invoicing reference)
-            client_summary.to_excel(writer, sheet_name='Client_Invoice_Totals', index=False)
-            
-            # Detailed breakdown by carrier
-            detailed_checklist.to_excel(writer, sheet_name='Carrier_Breakdown', index=False)
-            
-            # Shipment line items
-            if not shipment_details.empty:
-                # Select relevant columns for invoicing
-                invoice_details = shipment_details[[
-                    'client', 'carrier', 'tracking_number', 'service_type', 
-                    'ship_date', 'cost', 'billable_amount', 'cycle_period'
-                ]].copy()
-                invoice_details.to_excel(writer, sheet_name='Shipment_Line_Items', index=False)
-            
-            # Summary totals
-            if not client_summary.empty:
-                totals = pd.DataFrame([
-                    ['Total Clients', len(client_summary)],
-                    ['Total Shipments', client_summary['shipment_count'].sum()],
-                    ['Total Cost', client_summary['total_cost'].sum()],
-                    ['Total Billable', client_summary['total_billable'].sum()],
-                    ['Total Profit', client_summary['profit'].sum()],
-                    ['Average Margin %', client_summary['profit_margin'].mean()]
-                ], columns=['Metric', 'Value'])
-                totals.to_excel(writer, sheet_name='Summary_Totals', index=False)
-        
-        return output.getvalue()
+        # Shipment line items
+        if not shipment_details.empty:
+            sheets.append(('Shipment_Line_Items', shipment_details))
+        
+        # Summary totals
+        if not client_summary.empty:
+            totals = pd.DataFrame([
+                ['Total Clients', len(client_summary)],
+                ['Total Shipments', client_summary['shipment_count'].sum()],
+                ['Total Cost', client_summary['total_cost'].sum()],
+                ['Total Billable', client_summary['total_billable'].sum()],
+                ['Total Profit', client_summary['profit'].sum()],
+                ['Average Margin %', client_summary['profit_margin'].mean()]
+            ], columns=['Metric', 'Value'])
+            sheets.append(('Summary_Totals', totals))
+        
+        if file_format == 'xlsx':
+            # Create Excel file in memory, streaming rows sheet by sheet
+            return write_excel(sheets)
+        return write_parquet_zip(sheets)
 
     def delete_carrier_data(self, carrier_name, cycle_period):
         """Delete all data for a specific carrier/cycle combination"""
+        success, message = self.apply_deletions([('carrier', (carrier_name, cycle_period))])
+        if success:
+            return True, f"Successfully deleted data for {carrier_name} - {cycle_period}"
+        return False, message
+
+    def delete_client_cycle(self, client_name, cycle_period):
+        """Delete all data for a specific client/cycle combination (all carriers)"""
+        success, message = self.apply_deletions([('client', (client_name, cycle_period))])
+        if success:
+            return True, f"Successfully deleted all data for {client_name} - {cycle_period}"
+        return False, message
+
+    @synchronized
+    def apply_deletions(self, queue):
+        """
+        Apply a queue of staged deletions with a single rewrite per data file
+        (per affected partition for shipment data).
+        Each queue entry is a (kind, args) tuple:
+        - ('carrier', (carrier_name, cycle_period))
+        - ('client', (client_name, cycle_period))
+        """
+        if not queue:
+            return False, "No deletions staged"
+        
         try:
-            # Remove from shipment data
-            shipment_data = self.load_shipment_data()
-            if not shipment_data.empty:
-                updated_shipments = shipment_data[
-                    ~((shipment_data['carrier'] == carrier_name) & 
-                      (shipment_data['cycle_period'] == cycle_period))
-                ]
-                self.save_shipment_data(updated_shipments)
+            def build_mask(df, kinds=('carrier', 'client')):
+                mask = pd.Series(False, index=df.index)
+                for kind, (name, cycle_period) in queue:
+                    if kind in kinds:
+                        mask |= (df[kind] == name) & (df['cycle_period'] == cycle_period)
+                return mask
+            
+            # Remove from shipment data: carrier deletions drop whole partitions,
+            # client deletions rewrite only the partitions of the affected cycles
+            for kind, (name, cycle_period) in queue:
+                if kind == 'carrier':
+                    self._delete_shipment_partition(name, cycle_period)
+            
+            client_cycles = sorted({cycle_period for kind, (_, cycle_period) in queue if kind == 'client'})
+            if client_cycles:
+                cycle_filter = ds.field('cycle_period').isin(client_cycles)
+                shipment_data = self.load_shipment_data(filter=cycle_filter)
+                client_mask = build_mask(shipment_data, kinds=('client',))
+                if client_mask.any():
+                    self._replace_shipment_partitions(cycle_filter, shipment_data[~client_mask])
             
             # Remove from billing checklist
             checklist = self.load_billing_checklist()
             if not checklist.empty:
-                updated_checklist = checklist[
-                    ~((checklist['carrier'] == carrier_name) & 
-                      (checklist['cycle_period'] == cycle_period))
-                ]
-                self.save_billing_checklist(updated_checklist)
+                self.save_billing_checklist(checklist[~build_mask(checklist)])
             
-            # Update upload log (mark as deleted but keep for audit trail)
+            # Update upload log (mark carrier uploads as deleted but keep for audit trail)
             upload_log = self.load_upload_log()
-            if not upload_log.empty:
-                mask = ((upload_log['carrier'] == carrier_name) & 
-                       (upload_log['cycle_period'] == cycle_period))
-                # Add status column if it doesn't exist
-                if 'status' not in upload_log.columns:
-                    upload_log['status'] = 'Active'
-                if 'deleted_date' not in upload_log.columns:
-                    upload_log['deleted_date'] = None
-                    
+            if not upload_log.empty and any(kind == 'carrier' for kind, _ in queue):
+                mask = build_mask(upload_log, kinds=('carrier',))
                 upload_log.loc[mask, 'status'] = 'Deleted'
                 upload_log.loc[mask, 'deleted_date'] = datetime.now()
                 self.save_upload_log(upload_log)
             
-            return True, f"Successfully deleted data for {carrier_name} - {cycle_period}"
-            
-        except Exception as e:
-            return False, f"Error deleting data: {str(e)}"
-
-    def delete_client_cycle(self, client_name, cycle_period):
-        """Delete all data for a specific client/cycle combination (all carriers)"""
-        try:
-            # Remove from shipment data
-            shipment_data = self.load_shipment_data()
-            if not shipment_data.empty:
-                updated_shipments = shipment_data[
-                    ~((shipment_data['client'] == client_name) & 
-                      (shipment_data['cycle_period'] == cycle_period))
-                ]
-                self.save_shipment_data(updated_shipments)
-            
-            # Remove from billing checklist
-            checklist = self.load_billing_checklist()
-            if not checklist.empty:
-                updated_checklist = checklist[
-                    ~((checklist['client'] == client_name) & 
-                      (checklist['cycle_period'] == cycle_period))
-                ]
-                self.save_billing_checklist(updated_checklist)
-            
-            return True, f"Successfully deleted all data for {client_name} - {cycle_period}"
+            return True, f"Successfully applied {len(queue)} deletion(s)"
             
         except Exception as e:
             return False, f"Error deleting data: {str(e)}"
 
     def get_data_summary(self):
-        """Get summary of all uploaded data grouped by carrier/cycle"""
-        shipment_data = self.load_shipment_data()
+        """
+        Get summary of all uploaded data grouped by carrier/cycle, recomputed
+        only when the shipment dataset changes on disk
+        """
+        return self._derived_cached(self.shipment_data_dir, 'data_summary', self._build_data_summary)
+    
+    def _build_data_summary(self):
+        """Carrier/cycle/client aggregation behind get_data_summary"""
+        shipment_data = self.load_shipment_data(columns=[
+            'carrier', 'cycle_period', 'client', 'tracking_number',
+            'cost', 'billable_amount', 'upload_timestamp'
+        ])
         
         if shipment_data.empty:
             return pd.DataFrame()
         
-        summary = shipment_data.groupby(['carrier', 'cycle_period', 'client']).agg({
-            'tracking_number': 'count',
-            'cost': 'sum',
-            'billable_amount': 'sum',
-            'upload_timestamp': 'max'
-        }).reset_index()
-        
-        summary.rename(columns={
-            'tracking_number': 'shipment_count',
-            'upload_timestamp': 'upload_date'
-        }, inplace=True)
+        # Named aggregations; groups are left unsorted since the result is sorted below
+        summary = shipment_data.groupby(['carrier', 'cycle_period', 'client'], observed=True, sort=False).agg(
+            shipment_count=('tracking_number', 'size'),
+            cost=('cost', 'sum'),
+            billable_amount=('billable_amount', 'sum'),
+            upload_date=('upload_timestamp', 'max')
+        ).reset_index()
         
         summary['profit'] = summary['billable_amount'] - summary['cost']
         
+        # Only the count is downcast; money stays float64, since float32 keeps
+        # about 7 significant digits and would misstate totals above ~$100k
+        summary['shipment_count'] = pd.to_numeric(summary['shipment_count'], downcast='unsigned')
+        
         return summary.sort_values(['cycle_period', 'carrier', 'client'], ascending=[False, True, True])
+    
+    def get_data_summary_table(self):
+        """
+        get_data_summary as an Arrow table for st.dataframe, converted once per
+        dataset change rather than by Streamlit on every rerun
+        """
+        return self._derived_cached(self.shipment_data_dir, 'data_summary_table', self._build_data_summary_table)
+    
+    def _build_data_summary_table(self):
+        """Arrow conversion behind get_data_summary_table"""
+        return pa.Table.from_pandas(self.get_data_summary(), preserve_index=False)
 
+    @classmethod
+    def check_confirmation_code(cls, confirmation_code):
+        """Constant-time check of the reset confirmation code"""
+        return hmac.compare_digest(
+            (confirmation_code or '').encode('utf-8'),
+            cls.RESET_CONFIRMATION_CODE.encode('utf-8')
+        )
+    
+    @synchronized
     def clear_all_data(self, confirmation_code):
         """Clear all data after confirmation"""
-        if confirmation_code != "DELETE_ALL_BILLING_DATA":
+        if not self.check_confirmation_code(confirmation_code):
             return False, "Invalid confirmation code"
         
         try:
-            # Reset all Excel files
-            self.shipment_data_file.unlink(missing_ok=True)
+            # Reset all data files
+            shutil.rmtree(self.shipment_data_dir, ignore_errors=True)
+            self._invalidate_cache(self.shipment_data_dir)
+            for legacy_file in self.legacy_shipment_data_files:
+                legacy_file.unlink(missing_ok=True)
             self.billing_checklist_file.unlink(missing_ok=True)
+            self.legacy_billing_checklist_file.unlink(missing_ok=True)
             self.upload_log_file.unlink(missing_ok=True)
+            self.legacy_upload_log_file.unlink(missing_ok=True)
             
             # Clear processed files list
-            self.config['processed_files'] = []
-            self.save_config()
+            self.clear_processed_files()
             
             # Reinitialize
             self.init_excel_files()
@@ -1099,35 +1619,120 @@ class FreightBillingChecker:
             return False, f"Error clearing data: {str(e)}"
 
     def export_data_backup(self):
-        """Export complete backup of all data"""
+        """
+        Export complete backup of all data to a temporary .xlsx file and return
+        its Path (None on failure). The caller deletes the file once served.
+        """
+        backup_path = None
         try:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                # Shipment data
-                shipment_data = self.load_shipment_data()
-                if not shipment_data.empty:
-                    shipment_data.to_excel(writer, sheet_name='Shipment_Data', index=False)
-                
-                # Billing checklist
-                checklist = self.load_billing_checklist()
-                if not checklist.empty:
-                    checklist.to_excel(writer, sheet_name='Billing_Checklist', index=False)
-                
-                # Upload log
-                upload_log = self.load_upload_log()
-                if not upload_log.empty:
-                    upload_log.to_excel(writer, sheet_name='Upload_Log', index=False)
+            # Loaded one after another under the tracker lock (each load takes it
+            # anyway), so the three sheets are a consistent snapshot
+            with self._lock:
+                sheets = [
+                    ('Shipment_Data', self.load_shipment_data()),
+                    ('Billing_Checklist', self.load_billing_checklist()),
+                    ('Upload_Log', self.load_upload_log())
+                ]
             
-            return output.getvalue()
+            sheets = [(sheet_name, df) for sheet_name, df in sheets if not df.empty]
+            if not sheets:
+                raise ValueError("No data to back up")
+            
+            # Saved straight to disk rather than into a BytesIO and then copied out
+            fd, backup_path = tempfile.mkstemp(prefix='freight_billing_backup_', suffix='.xlsx')
+            os.close(fd)
+            return write_excel(sheets, Path(backup_path))
         except Exception as e:
             print(f"Error creating backup: {e}")
+            if backup_path:
+                Path(backup_path).unlink(missing_ok=True)
             return None
+    
+    def export_data_backup_bytes(self):
+        """Build the backup workbook and return its bytes, removing the temporary file"""
+        backup_path = self.export_data_backup()
+        if backup_path is None:
+            raise RuntimeError("Backup could not be created")
+        try:
+            return backup_path.read_bytes()
+        finally:
+            backup_path.unlink(missing_ok=True)
 
 
 # ============================================================================
 # STREAMLIT UI
 # ============================================================================
 
+# Static help text for the Settings page
+FILENAME_CONVENTION_MD = """
+**Filename Convention:**
+Files should be named as `CarrierName_CyclePeriod.xlsx` for automatic detection.
+
+Examples:
+- `FedEx_2024-11.xlsx`
+- `UPS_November2024.csv`
+- `DHL_2024-11-Week1.xlsx`
+"""
+
+SUPPORTED_COLUMNS_MD = """
+**The system automatically detects these column variations:**
+
+- **Client:** `client`, `customer`, `customer_name`, `account`, `consignee`, `shipper`, `company`
+- **Cost:** `cost`, `freight_cost`, `shipping_cost`, `carrier_charge`, `total_cost`
+- **Billable Amount:** `billable`, `billable_amount`, `revenue`, `charge_amount`, `bill_amount`
+- **Tracking:** `tracking`, `tracking_number`, `tracking_id`, `awb`, `pro`
+- **Service:** `service`, `service_type`, `service_level`
+- **Weight:** `weight`, `package_weight`, `total_weight`
+- **Zone:** `zone`, `delivery_zone`, `shipping_zone`
+- **Dates:** `ship_date`, `pickup_date`, `delivery_date`
+"""
+
+@st.cache_resource
+def get_checker(data_folder="billing_data"):
+    """
+    Single FreightBillingChecker per data folder, kept with its DataFrame cache
+    across reruns and shared by all sessions (its methods lock, see synchronized)
+    """
+    return FreightBillingChecker(data_folder)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def scan_folder_cached(_tracker, folder, nonce):
+    """
+    Folder scan memoized across reruns for up to 30 seconds. Bumping nonce
+    (the Scan Folder button) forces a fresh scan of the folder.
+    """
+    return _tracker.scan_input_folder()
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def check_existing_cached(_tracker, carrier_name, cycle_period):
+    """
+    Existing-data check for the upload form, reused while the carrier/cycle
+    inputs are unchanged. process_carrier_file re-checks before writing; every
+    page that changes the shipment dataset clears this cache.
+    """
+    return _tracker.check_existing_data(carrier_name, cycle_period)
+
+
+def currency_column_config(*columns):
+    """Column config that formats numeric columns as dollars in the browser"""
+    return {col: st.column_config.NumberColumn(format="$%.2f") for col in columns}
+
+
+def percent_column_config(*columns):
+    """Column config that formats numeric columns as percentages in the browser"""
+    return {col: st.column_config.NumberColumn(format="%.1f%%") for col in columns}
+
+
+def summary_column_config():
+    """Browser-side formatting for the cost/billable/profit/margin summary columns"""
+    return {
+        **currency_column_config('total_cost', 'total_billable', 'profit'),
+        **percent_column_config('profit_margin')
+    }
+
+
 def main():
     st.set_page_config(
         page_title="Freight Billing Tracker",
@@ -1136,27 +1741,12 @@ def main():
         initial_sidebar_state="expanded"
     )
     
-    # Custom CSS
-    st.markdown("""
-    <style>
-    .main-header {font-size: 2.5rem; font-weight: bold; color: #1E88E5;}
-    .metric-card {background-color: #f8f9fa; padding: 1rem; border-radius: 0.5rem;}
-    .status-ready {color: #28a745; font-weight: bold;}
-    .status-billed {color: #6c757d; font-weight: bold;}
-    .file-new {background-color: #d4edda; padding: 0.5rem; border-radius: 0.25rem; margin: 0.25rem 0;}
-    .file-processed {background-color: #f8f9fa; padding: 0.5rem; border-radius: 0.25rem; margin: 0.25rem 0;}
-    </style>
-    """, unsafe_allow_html=True)
-    
     st.title("📋 Freight Billing Checklist Tracker")
     st.markdown("*Track billable amounts by carrier and client for invoice preparation*")
     st.markdown("---")
     
-    # Initialize tracker
-    if 'tracker' not in st.session_state:
-        st.session_state.tracker = FreightBillingChecker()
-    
-    tracker = st.session_state.tracker
+    # Initialize tracker (shared across reruns and sessions)
+    tracker = get_checker()
     
     # Sidebar for navigation
     st.sidebar.title("Navigation")
@@ -1220,13 +1810,22 @@ def show_scan_folder_page(tracker):
     with col2:
         show_processed = st.checkbox("Show processed files", value=False)
     
-    # Scan folder
-    files_info, error = tracker.scan_input_folder()
+    # Scan folder (cached between reruns; the Scan button forces a rescan)
+    if 'scan_nonce' not in st.session_state:
+        st.session_state.scan_nonce = 0
+    if scan_button:
+        st.session_state.scan_nonce += 1
+    files_info, error = scan_folder_cached(tracker, current_folder, st.session_state.scan_nonce)
     
     if error:
         st.error(f"❌ {error}")
         return
     
+    # Processed flags come from the live upload log rather than the cached scan
+    processed_paths = tracker.get_processed_files()
+    for file_info in files_info:
+        file_info['is_processed'] = file_info['path'] in processed_paths
+    
     if not files_info:
         st.info("📋 No Excel or CSV files found in the folder.")
         return
@@ -1273,104 +1872,70 @@ def show_scan_folder_page(tracker):
     # Process files section
     if 'selected_files' not in st.session_state:
         st.session_state.selected_files = {}
+    if 'file_editor_version' not in st.session_state:
+        st.session_state.file_editor_version = 0
     
-    # Select all / none buttons
+    # Select all / none buttons (a new editor key drops edits made to the old selection).
+    # The table is rendered below them, so the click's own rerun already shows the change
     col1, col2, col3 = st.columns([1, 1, 4])
     with col1:
         if st.button("☑️ Select All New"):
             for f in display_files:
                 if not f['is_processed']:
                     st.session_state.selected_files[f['path']] = True
-            st.rerun()
+            st.session_state.file_editor_version += 1
     with col2:
         if st.button("⬜ Clear Selection"):
             st.session_state.selected_files = {}
-            st.rerun()
+            st.session_state.file_editor_version += 1
+    
+    # Display files as one editable table instead of a widget row per file
+    files_df = pd.DataFrame({
+        'selected': [
+            not f['is_processed'] and st.session_state.selected_files.get(f['path'], False)
+            for f in display_files
+        ],
+        'filename': [f['filename'] for f in display_files],
+        'size_mb': [f['size_mb'] for f in display_files],
+        'modified_date': [f['modified_date'] for f in display_files],
+        'carrier_input': [f['carrier'] or '' for f in display_files],
+        'cycle_input': [f['cycle_period'] or '' for f in display_files],
+        'status': [
+            "✅ Processed" if f['is_processed']
+            else "🆕 Ready" if f['parse_success']
+            else "⚠️ Manual entry"
+            for f in display_files
+        ]
+    })
+    
+    edited_files = st.data_editor(
+        files_df,
+        column_config={
+            'selected': st.column_config.CheckboxColumn("Select"),
+            'filename': st.column_config.TextColumn("File"),
+            'size_mb': st.column_config.NumberColumn("Size (MB)", format="%.2f"),
+            'modified_date': st.column_config.DatetimeColumn("Modified", format="YYYY-MM-DD HH:mm"),
+            'carrier_input': st.column_config.TextColumn("Carrier"),
+            'cycle_input': st.column_config.TextColumn("Cycle", help="e.g., 2024-11"),
+            'status': st.column_config.TextColumn("Status")
+        },
+        disabled=['filename', 'size_mb', 'modified_date', 'status'],
+        hide_index=True,
+        use_container_width=True,
+        key=f"file_editor_{st.session_state.file_editor_version}"
+    )
     
-    # Display files
+    # Processed files can't be selected again; their checkboxes are ignored
     files_to_process = []
-    
-    for idx, file_info in enumerate(display_files):
-        file_key = f"file_{idx}"
-        
-        with st.container():
-            # File card
-            if file_info['is_processed']:
-                st.markdown(f"<div class='file-processed'>", unsafe_allow_html=True)
-            else:
-                st.markdown(f"<div class='file-new'>", unsafe_allow_html=True)
-            
-            col1, col2, col3, col4, col5 = st.columns([0.5, 3, 2, 2, 1.5])
-            
-            with col1:
-                if not file_info['is_processed']:
-                    selected = st.checkbox(
-                        "Select",
-                        key=f"select_{file_key}",
-                        value=st.session_state.selected_files.get(file_info['path'], False),
-                        label_visibility="collapsed"
-                    )
-                    st.session_state.selected_files[file_info['path']] = selected
-                else:
-                    st.write("✅")
-            
-            with col2:
-                st.write(f"**{file_info['filename']}**")
-                st.caption(f"Size: {file_info['size_mb']} MB | Modified: {file_info['modified_date'].strftime('%Y-%m-%d %H:%M')}")
-            
-            with col3:
-                if file_info['parse_success']:
-                    carrier_value = st.text_input(
-                        "Carrier",
-                        value=file_info['carrier'],
-                        key=f"carrier_{file_key}",
-                        disabled=file_info['is_processed'],
-                        label_visibility="collapsed"
-                    )
-                else:
-                    carrier_value = st.text_input(
-                        "Carrier (required)",
-                        placeholder="Enter carrier name",
-                        key=f"carrier_{file_key}",
-                        disabled=file_info['is_processed'],
-                        label_visibility="collapsed"
-                    )
-                file_info['carrier_input'] = carrier_value
-            
-            with col4:
-                if file_info['parse_success']:
-                    cycle_value = st.text_input(
-                        "Cycle",
-                        value=file_info['cycle_period'],
-                        key=f"cycle_{file_key}",
-                        disabled=file_info['is_processed'],
-                        label_visibility="collapsed"
-                    )
-                else:
-                    cycle_value = st.text_input(
-                        "Cycle (required)",
-                        placeholder="e.g., 2024-11",
-                        key=f"cycle_{file_key}",
-                        disabled=file_info['is_processed'],
-                        label_visibility="collapsed"
-                    )
-                file_info['cycle_input'] = cycle_value
-            
-            with col5:
-                if file_info['is_processed']:
-                    st.write("✅ Processed")
-                elif not file_info['parse_success']:
-                    st.write("⚠️ Manual entry")
-                else:
-                    st.write("🆕 Ready")
-            
-            # Track for processing
-            if st.session_state.selected_files.get(file_info['path'], False):
-                files_to_process.append(file_info)
-            
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        st.markdown("---")
+    for file_info, row in zip(display_files, edited_files.itertuples(index=False)):
+        selected = bool(row.selected) and not file_info['is_processed']
+        st.session_state.selected_files[file_info['path']] = selected
+        if selected:
+            files_to_process.append({
+                **file_info,
+                'carrier_input': (row.carrier_input or '').strip(),
+                'cycle_input': (row.cycle_input or '').strip()
+            })
     
     # Process selected files
     if files_to_process:
@@ -1414,23 +1979,27 @@ def show_scan_folder_page(tracker):
                 status_text = st.empty()
                 results = []
                 
-                for i, file_info in enumerate(valid_files):
-                    status_text.text(f"Processing {file_info['filename']}...")
-                    
-                    success, message = tracker.process_file_from_path(
-                        file_info['path'],
-                        file_info['carrier'],
-                        file_info['cycle'],
-                        replace_existing=replace_existing
-                    )
-                    
+                # Files are parsed in parallel and ingested one at a time, in order
+                status_text.text(f"Processing {len(valid_files)} file(s)...")
+                processed = tracker.process_files_from_paths(
+                    [(f['path'], f['carrier'], f['cycle']) for f in valid_files],
+                    replace_existing=replace_existing
+                )
+                
+                # Push progress to the browser at most every 0.25s, plus the final update
+                last_update = 0.0
+                for i, (file_info, (success, message)) in enumerate(zip(valid_files, processed)):
                     results.append({
                         'filename': file_info['filename'],
                         'success': success,
                         'message': message
                     })
                     
-                    progress_bar.progress((i + 1) / len(valid_files))
+                    now = time.monotonic()
+                    if now - last_update > 0.25 or i == len(valid_files) - 1:
+                        status_text.text(f"Processed {i + 1} of {len(valid_files)}: {file_info['filename']}")
+                        progress_bar.progress((i + 1) / len(valid_files))
+                        last_update = now
                 
                 status_text.empty()
                 
@@ -1441,18 +2010,20 @@ def show_scan_folder_page(tracker):
                 fail_count = len(results) - success_count
                 
                 if success_count > 0:
+                    check_existing_cached.clear()
                     st.success(f"✅ Successfully processed {success_count} file(s)")
                 if fail_count > 0:
                     st.error(f"❌ Failed to process {fail_count} file(s)")
                 
-                for result in results:
-                    if result['success']:
-                        st.write(f"✅ **{result['filename']}**: {result['message']}")
-                    else:
-                        st.write(f"❌ **{result['filename']}**: {result['message']}")
+                # One markdown element for the whole list rather than one per file
+                st.markdown("\n".join(
+                    f"- {'✅' if result['success'] else '❌'} **{result['filename']}**: {result['message']}"
+                    for result in results
+                ))
                 
                 # Clear selection
                 st.session_state.selected_files = {}
+                st.session_state.file_editor_version += 1
                 
                 if st.button("🔄 Refresh"):
                     st.rerun()
@@ -1462,10 +2033,10 @@ def show_billing_dashboard(tracker):
     """Show billing dashboard"""
     st.header("📊 Billing Dashboard")
     
-    # Get data
-    client_summary = tracker.get_client_summary()
+    # Get data (aggregated once per checklist change, not on every rerun)
+    metrics = tracker.get_dashboard_metrics()
     
-    if client_summary.empty:
+    if not metrics:
         st.info("📋 No billing data available. Upload carrier reconciliation files to start tracking.")
         return
     
@@ -1473,27 +2044,24 @@ def show_billing_dashboard(tracker):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_billable = client_summary['total_billable'].sum()
-        st.metric("💰 Total to Bill", f"${total_billable:,.2f}")
+        st.metric("💰 Total to Bill", f"${metrics['total_billable']:,.2f}")
     
     with col2:
-        total_cost = client_summary['total_cost'].sum()
-        st.metric("💸 Total Cost", f"${total_cost:,.2f}")
+        st.metric("💸 Total Cost", f"${metrics['total_cost']:,.2f}")
     
     with col3:
-        total_profit = client_summary['profit'].sum()
-        st.metric("📈 Total Profit", f"${total_profit:,.2f}")
+        st.metric("📈 Total Profit", f"${metrics['total_profit']:,.2f}")
     
     with col4:
-        ready_to_bill = len(client_summary[client_summary['invoice_status'] == 'Ready to Bill'])
-        st.metric("📋 Ready to Bill", ready_to_bill)
+        st.metric("📋 Ready to Bill", metrics['ready_to_bill'])
     
-    # Charts
+    # Charts (plotly is imported only on the pages that draw them)
+    import plotly.express as px
     col1, col2 = st.columns(2)
     
     with col1:
         # Billing status pie chart
-        status_counts = client_summary['invoice_status'].value_counts()
+        status_counts = metrics['status_counts']
         fig = px.pie(
             values=status_counts.values,
             names=status_counts.index,
@@ -1503,7 +2071,7 @@ def show_billing_dashboard(tracker):
     
     with col2:
         # Top clients by billable amount
-        top_clients = client_summary.groupby('client')['total_billable'].sum().sort_values(ascending=False).head(10)
+        top_clients = metrics['top_clients']
         fig = px.bar(
             x=top_clients.index,
             y=top_clients.values,
@@ -1516,19 +2084,13 @@ def show_billing_dashboard(tracker):
     st.subheader("📋 Recent Client Billing Summary")
     
     # Show latest cycle data
-    if not client_summary.empty:
-        latest_cycle = client_summary['cycle_period'].max()
-        latest_data = client_summary[client_summary['cycle_period'] == latest_cycle]
-        
-        st.write(f"**Latest Cycle: {latest_cycle}**")
-        
-        # Format for display
-        display_data = latest_data.copy()
-        for col in ['total_cost', 'total_billable', 'profit']:
-            display_data[col] = display_data[col].apply(lambda x: f"${x:,.2f}")
-        display_data['profit_margin'] = display_data['profit_margin'].apply(lambda x: f"{x:.1f}%")
-        
-        st.dataframe(display_data, use_container_width=True, hide_index=True)
+    st.write(f"**Latest Cycle: {metrics['latest_cycle']}**")
+    
+    # Numbers stay numeric (and sortable); formatting happens in the browser
+    st.dataframe(
+        metrics['latest_data'], use_container_width=True, hide_index=True,
+        column_config=summary_column_config()
+    )
 
 
 def show_upload_page(tracker):
@@ -1550,8 +2112,8 @@ def show_upload_page(tracker):
         )
         
         if uploaded_file:
-            # Show file info
-            file_size_mb = len(uploaded_file.getvalue()) / (1024 * 1024)
+            # Show file info (size comes from the upload metadata, no buffer copy)
+            file_size_mb = uploaded_file.size / (1024 * 1024)
             if file_size_mb > 30:
                 st.warning(f"⚠️ Large file detected: {file_size_mb:.1f} MB. Processing may take 2-3 minutes.")
             elif file_size_mb > 10:
@@ -1562,10 +2124,16 @@ def show_upload_page(tracker):
             # Show file preview for smaller files
             if file_size_mb < 20:
                 try:
-                    if uploaded_file.name.endswith('.xlsx'):
-                        preview_df = pd.read_excel(uploaded_file, nrows=5)
-                    else:
-                        preview_df = pd.read_csv(uploaded_file, nrows=5)
+                    # Only the first rows are parsed, and only once per uploaded file
+                    preview_key = (uploaded_file.name, uploaded_file.size)
+                    if st.session_state.get('preview_key') != preview_key:
+                        uploaded_file.seek(0)
+                        if uploaded_file.name.lower().endswith('.xlsx'):
+                            st.session_state.preview_df = read_excel(uploaded_file, nrows=5)
+                        else:
+                            st.session_state.preview_df = read_csv_head(uploaded_file, nrows=5)
+                        st.session_state.preview_key = preview_key
+                    preview_df = st.session_state.preview_df
                     
                     st.subheader("👀 File Preview")
                     st.dataframe(preview_df, use_container_width=True)
@@ -1592,7 +2160,7 @@ def show_upload_page(tracker):
         
         # Check for existing data
         if carrier_name and cycle_period:
-            has_existing, existing_count = tracker.check_existing_data(carrier_name, cycle_period)
+            has_existing, existing_count = check_existing_cached(tracker, carrier_name, cycle_period)
             if has_existing:
                 st.warning(f"⚠️ Existing data found: {existing_count:,} records for {carrier_name} - {cycle_period}")
                 replace_existing = st.checkbox(
@@ -1620,7 +2188,7 @@ def show_upload_page(tracker):
         
         if st.button("🚀 Process File", type="primary"):
             if uploaded_file and carrier_name and cycle_period:
-                file_size_mb = len(uploaded_file.getvalue()) / (1024 * 1024)
+                file_size_mb = uploaded_file.size / (1024 * 1024)
                 if file_size_mb > 20:
                     processing_msg = f"⏳ Processing large file ({file_size_mb:.1f} MB)... This may take 2-3 minutes."
                 elif file_size_mb > 10:
@@ -1629,7 +2197,6 @@ def show_upload_page(tracker):
                     processing_msg = "⏳ Processing file..."
                 
                 with st.spinner(processing_msg):
-                    uploaded_file.seek(0)
                     success, message = tracker.process_carrier_file(
                         uploaded_file, 
                         carrier_name, 
@@ -1638,6 +2205,7 @@ def show_upload_page(tracker):
                     )
                     
                     if success:
+                        check_existing_cached.clear()
                         st.success(f"✅ {message}")
                         st.balloons()
                     else:
@@ -1656,33 +2224,31 @@ def show_client_checklist(tracker):
         st.info("📋 No billing data available")
         return
     
-    # Filters
+    # Filters (distinct values cached with the checklist rather than scanned per rerun)
+    filter_options = tracker.get_filter_options()
     col1, col2 = st.columns(2)
     
     with col1:
-        cycles = ['All'] + list(client_summary['cycle_period'].unique())
+        cycles = ['All'] + filter_options['cycle_period']
         selected_cycle = st.selectbox("📅 Filter by Cycle", cycles)
     
     with col2:
-        clients = ['All'] + list(client_summary['client'].unique())
+        clients = ['All'] + filter_options['client']
         selected_client = st.selectbox("👤 Filter by Client", clients)
     
-    # Apply filters
-    filtered_data = client_summary.copy()
-    if selected_cycle != 'All':
-        filtered_data = filtered_data[filtered_data['cycle_period'] == selected_cycle]
-    if selected_client != 'All':
-        filtered_data = filtered_data[filtered_data['client'] == selected_client]
+    # Apply filters as one combined mask so the table is only indexed once
+    mask = np.ones(len(client_summary), dtype=bool)
+    for col, value in (('cycle_period', selected_cycle), ('client', selected_client)):
+        if value != 'All':
+            mask &= (client_summary[col] == value).to_numpy(dtype=bool, na_value=False)
+    filtered_data = client_summary[mask]
     
     # Display data
     if not filtered_data.empty:
-        # Format for display
-        display_data = filtered_data.copy()
-        for col in ['total_cost', 'total_billable', 'profit']:
-            display_data[col] = display_data[col].apply(lambda x: f"${x:,.2f}")
-        display_data['profit_margin'] = display_data['profit_margin'].apply(lambda x: f"{x:.1f}%")
-        
-        st.dataframe(display_data, use_container_width=True, hide_index=True)
+        st.dataframe(
+            filtered_data, use_container_width=True, hide_index=True,
+            column_config=summary_column_config()
+        )
         
         # Mark as billed section
         st.markdown("---")
@@ -1719,32 +2285,31 @@ def show_carrier_breakdown(tracker):
         st.info("📋 No billing data available")
         return
     
-    # Filters
+    # Filters (distinct values cached with the checklist rather than scanned per rerun)
+    filter_options = tracker.get_filter_options()
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        clients = ['All'] + list(checklist['client'].unique())
+        clients = ['All'] + filter_options['client']
         selected_client = st.selectbox("👤 Client", clients)
     
     with col2:
         if selected_client != 'All':
-            cycles = ['All'] + list(checklist[checklist['client'] == selected_client]['cycle_period'].unique())
+            cycles = ['All'] + filter_options['client_cycles'].get(selected_client, [])
         else:
-            cycles = ['All'] + list(checklist['cycle_period'].unique())
+            cycles = ['All'] + filter_options['cycle_period']
         selected_cycle = st.selectbox("📅 Cycle", cycles)
     
     with col3:
-        carriers = ['All'] + list(checklist['carrier'].unique())
+        carriers = ['All'] + filter_options['carrier']
         selected_carrier = st.selectbox("🚚 Carrier", carriers)
     
-    # Apply filters
-    filtered_data = checklist.copy()
-    if selected_client != 'All':
-        filtered_data = filtered_data[filtered_data['client'] == selected_client]
-    if selected_cycle != 'All':
-        filtered_data = filtered_data[filtered_data['cycle_period'] == selected_cycle]
-    if selected_carrier != 'All':
-        filtered_data = filtered_data[filtered_data['carrier'] == selected_carrier]
+    # Apply filters as one combined mask so the table is only indexed once
+    mask = np.ones(len(checklist), dtype=bool)
+    for col, value in (('client', selected_client), ('cycle_period', selected_cycle), ('carrier', selected_carrier)):
+        if value != 'All':
+            mask &= (checklist[col] == value).to_numpy(dtype=bool, na_value=False)
+    filtered_data = checklist[mask]
     
     if filtered_data.empty:
         st.info("No data matching filters")
@@ -1764,14 +2329,10 @@ def show_carrier_breakdown(tracker):
     
     # Data table
     st.subheader("📋 Carrier Details")
-    display_data = filtered_data.copy()
-    for col in ['total_cost', 'total_billable', 'profit']:
-        if col in display_data.columns:
-            display_data[col] = display_data[col].apply(lambda x: f"${x:,.2f}")
-    if 'profit_margin' in display_data.columns:
-        display_data['profit_margin'] = display_data['profit_margin'].apply(lambda x: f"{x:.1f}%")
-    
-    st.dataframe(display_data, use_container_width=True, hide_index=True)
+    st.dataframe(
+        filtered_data, use_container_width=True, hide_index=True,
+        column_config=summary_column_config()
+    )
 
 
 def show_reports(tracker):
@@ -1788,20 +2349,31 @@ def show_reports(tracker):
         
         client_summary = tracker.get_client_summary()
         if not client_summary.empty:
-            cycles = ['All'] + list(client_summary['cycle_period'].unique())
+            cycles = ['All'] + tracker.get_filter_options()['cycle_period']
             export_cycle = st.selectbox("📅 Export Cycle", cycles)
+            export_format = st.radio(
+                "📄 Format", ["Parquet", "Excel"], horizontal=True,
+                help="Parquet (a zip with one file per sheet) is much faster to build for large exports"
+            )
             
-            if st.button("📥 Generate Excel Export"):
+            if st.button("📥 Generate Export"):
                 cycle_filter = None if export_cycle == 'All' else export_cycle
-                excel_data = tracker.export_billing_data(cycle_period=cycle_filter)
+                base_name = f"billing_checklist_{export_cycle if export_cycle != 'All' else 'all'}_{datetime.now().strftime('%Y%m%d')}"
                 
-                filename = f"billing_checklist_{export_cycle if export_cycle != 'All' else 'all'}_{datetime.now().strftime('%Y%m%d')}.xlsx"
+                if export_format == "Excel":
+                    export_data = tracker.export_billing_data(cycle_period=cycle_filter, file_format='xlsx')
+                    filename = f"{base_name}.xlsx"
+                    mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                else:
+                    export_data = tracker.export_billing_data(cycle_period=cycle_filter)
+                    filename = f"{base_name}.zip"
+                    mime = "application/zip"
                 
                 st.download_button(
                     "📁 Download Billing Report",
-                    excel_data,
+                    export_data,
                     filename,
-                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    mime
                 )
                 st.success("✅ Report generated!")
     
@@ -1810,40 +2382,42 @@ def show_reports(tracker):
         
         client_summary = tracker.get_client_summary()
         if not client_summary.empty:
-            cycle_summary = client_summary.groupby('cycle_period').agg({
+            cycle_summary = client_summary.groupby('cycle_period', observed=True).agg({
                 'shipment_count': 'sum',
                 'total_cost': 'sum',
                 'total_billable': 'sum',
                 'profit': 'sum'
             }).reset_index()
-            cycle_summary['profit_margin'] = (
-                cycle_summary['profit'] / cycle_summary['total_billable'] * 100
-            ).round(2)
-            
-            display_summary = cycle_summary.copy()
-            for col in ['total_cost', 'total_billable', 'profit']:
-                display_summary[col] = display_summary[col].apply(lambda x: f"${x:,.2f}")
-            display_summary['profit_margin'] = display_summary['profit_margin'].apply(lambda x: f"{x:.1f}%")
+            cycle_summary['profit_margin'] = profit_margin(
+                cycle_summary['profit'], cycle_summary['total_billable']
+            )
             
-            st.dataframe(display_summary, use_container_width=True, hide_index=True)
+            st.dataframe(
+                cycle_summary, use_container_width=True, hide_index=True,
+                column_config=summary_column_config()
+            )
     
     elif report_type == "Carrier Performance":
         st.subheader("🚚 Carrier Performance Analysis")
         
         detailed_checklist = tracker.get_billing_checklist()
         if not detailed_checklist.empty:
-            carrier_performance = detailed_checklist.groupby('carrier').agg({
+            carrier_performance = detailed_checklist.groupby('carrier', observed=True).agg({
                 'shipment_count': 'sum',
                 'total_cost': 'sum',
                 'total_billable': 'sum',
                 'profit': 'sum'
             }).reset_index()
-            carrier_performance['profit_margin'] = (
-                carrier_performance['profit'] / carrier_performance['total_billable'] * 100
-            ).round(2)
+            carrier_performance['profit_margin'] = profit_margin(
+                carrier_performance['profit'], carrier_performance['total_billable']
+            )
             
-            st.dataframe(carrier_performance, use_container_width=True, hide_index=True)
+            st.dataframe(
+                carrier_performance, use_container_width=True, hide_index=True,
+                column_config=summary_column_config()
+            )
             
+            import plotly.express as px
             fig = px.bar(
                 carrier_performance, 
                 x='carrier', 
@@ -1857,18 +2431,31 @@ def show_data_management(tracker):
     """Show data management page"""
     st.header("🗂️ Data Management")
     
-    data_summary = tracker.get_data_summary()
-    
-    if data_summary.empty:
-        st.info("📋 No data to manage")
-        return
+    # Only the active section is rendered, so Reset never builds the summary
+    active_tab = st.radio(
+        "Section",
+        ["🗑️ Delete Data", "📊 Data Overview", "💾 Backup", "⚠️ Reset All"],
+        key="active_tab",
+        horizontal=True,
+        label_visibility="collapsed"
+    )
     
-    tab1, tab2, tab3, tab4 = st.tabs(["🗑️ Delete Data", "📊 Data Overview", "💾 Backup", "⚠️ Reset All"])
+    if active_tab in ("🗑️ Delete Data", "📊 Data Overview"):
+        # Cached in the tracker until the shipment dataset changes, not rebuilt per rerun
+        data_summary = tracker.get_data_summary()
+        
+        if data_summary.empty:
+            st.info("📋 No data to manage")
+            return
     
-    with tab1:
+    if active_tab == "🗑️ Delete Data":
         st.subheader("🗑️ Delete Uploaded Data")
         st.warning("⚠️ Deleting data cannot be undone. Consider backing up first.")
         
+        if 'pending_deletes' not in st.session_state:
+            st.session_state.pending_deletes = []
+        pending_deletes = st.session_state.pending_deletes
+        
         with st.form("delete_carrier_cycle"):
             col1, col2 = st.columns(2)
             
@@ -1883,159 +2470,226 @@ def show_data_management(tracker):
                 else:
                     delete_cycle = None
             
+            if st.form_submit_button("➕ Stage Deletion"):
+                entry = ('carrier', (delete_carrier, delete_cycle))
+                if delete_carrier and delete_cycle and entry not in pending_deletes:
+                    pending_deletes.append(entry)
+        
+        if pending_deletes:
+            st.markdown(f"**📋 Staged Deletions ({len(pending_deletes)})**")
+            # Counts per carrier/cycle from one groupby, looked up for all staged pairs at once
+            cycle_counts = data_summary.groupby(['carrier', 'cycle_period'], observed=True)['shipment_count'].sum()
+            preview = pd.DataFrame([key for _, key in pending_deletes], columns=['carrier', 'cycle_period'])
+            preview['shipment_count'] = (
+                cycle_counts.reindex(pd.MultiIndex.from_frame(preview)).fillna(0).astype('int64').to_numpy()
+            )
+            st.dataframe(preview, use_container_width=True, hide_index=True)
+            
             confirm_delete = st.checkbox("✅ I confirm deletion")
             
-            if st.form_submit_button("🗑️ Delete Data"):
-                if confirm_delete and delete_carrier and delete_cycle:
-                    success, message = tracker.delete_carrier_data(delete_carrier, delete_cycle)
-                    if success:
-                        st.success(f"✅ {message}")
-                        st.rerun()
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button(f"🗑️ Apply {len(pending_deletes)} Deletion(s)", type="primary"):
+                    if confirm_delete:
+                        success, message = tracker.apply_deletions(pending_deletes)
+                        if success:
+                            check_existing_cached.clear()
+                            st.session_state.pending_deletes = []
+                            st.success(f"✅ {message}")
+                            st.rerun()
+                        else:
+                            st.error(f"❌ {message}")
                     else:
-                        st.error(f"❌ {message}")
-                else:
-                    st.error("Please confirm deletion")
+                        st.error("Please confirm deletion")
+            with col2:
+                # Cleared in a callback, before the staged list above is rendered again
+                st.button(
+                    "↩️ Clear Staged Deletions",
+                    on_click=lambda: st.session_state.update(pending_deletes=[])
+                )
     
-    with tab2:
+    elif active_tab == "📊 Data Overview":
         st.subheader("📊 Data Overview")
         
+        # All four headline numbers from one aggregation call
+        overview = data_summary.agg({
+            'shipment_count': 'sum',
+            'client': 'nunique',
+            'carrier': 'nunique',
+            'cycle_period': 'nunique'
+        })
+        
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("📦 Total Shipments", f"{data_summary['shipment_count'].sum():,}")
+            st.metric("📦 Total Shipments", f"{int(overview['shipment_count']):,}")
         with col2:
-            st.metric("👥 Unique Clients", data_summary['client'].nunique())
+            st.metric("👥 Unique Clients", int(overview['client']))
         with col3:
-            st.metric("🚚 Carriers", data_summary['carrier'].nunique())
+            st.metric("🚚 Carriers", int(overview['carrier']))
         with col4:
-            st.metric("📅 Billing Cycles", data_summary['cycle_period'].nunique())
-        
-        st.dataframe(data_summary, use_container_width=True, hide_index=True)
+            st.metric("📅 Billing Cycles", int(overview['cycle_period']))
+        
+        # Pre-converted Arrow table, so Streamlit skips its pandas-to-Arrow step
+        st.dataframe(
+            tracker.get_data_summary_table(),
+            use_container_width=True,
+            hide_index=True,
+            column_config=currency_column_config('cost', 'billable_amount', 'profit')
+        )
     
-    with tab3:
-        st.subheader("💾 Data Backup")
-        
-        if st.button("📥 Generate Backup"):
-            backup_data = tracker.export_data_backup()
-            if backup_data:
-                filename = f"freight_billing_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                st.download_button(
-                    "📁 Download Complete Backup",
-                    backup_data,
-                    filename,
-                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-                st.success("✅ Backup generated!")
+    elif active_tab == "💾 Backup":
+        show_backup_section(tracker)
     
-    with tab4:
-        st.subheader("⚠️ Reset All Data")
-        st.error("🚨 **DANGER ZONE:** This will permanently delete ALL billing data")
-        
-        with st.form("reset_all_form"):
-            st.markdown("**To confirm, type:** `DELETE_ALL_BILLING_DATA`")
-            confirmation_code = st.text_input("Confirmation Code", type="password")
-            
-            if st.form_submit_button("🗑️ RESET ALL"):
-                if confirmation_code == "DELETE_ALL_BILLING_DATA":
-                    success, message = tracker.clear_all_data(confirmation_code)
-                    if success:
-                        st.success("✅ All data has been cleared")
-                        st.rerun()
-                    else:
-                        st.error(f"❌ {message}")
-                else:
-                    st.error("❌ Incorrect confirmation code")
+    elif active_tab == "⚠️ Reset All":
+        show_reset_section(tracker)
 
 
-def show_settings(tracker):
-    """Show settings page"""
-    st.header("⚙️ Settings")
-    
-    # Input Folder Configuration
-    st.subheader("📂 Input Folder Configuration")
-    
-    current_folder = tracker.get_input_folder()
-    
-    st.write(f"**Current Input Folder:** `{current_folder if current_folder else 'Not configured'}`")
-    
-    with st.form("folder_settings"):
-        new_folder = st.text_input(
-            "📁 Input Folder Path",
-            value=current_folder,
-            placeholder=r"e.g., C:\BillingFiles or \\server\share\billing",
-            help="Enter the full path to the folder containing carrier files"
-        )
-        
-        st.markdown("""
-        **Filename Convention:**
-        Files should be named as `CarrierName_CyclePeriod.xlsx` for automatic detection.
-        
-        Examples:
-        - `FedEx_2024-11.xlsx`
-        - `UPS_November2024.csv`
-        - `DHL_2024-11-Week1.xlsx`
-        """)
-        
-        if st.form_submit_button("💾 Save Settings"):
-            tracker.set_input_folder(new_folder)
-            st.success(f"✅ Input folder updated to: {new_folder}")
+@st.fragment
+def show_backup_section(tracker):
+    """Backup section; a fragment, so its button reruns only this section"""
+    st.subheader("💾 Data Backup")
+    
+    # The download callable raises when there is nothing to export, so only
+    # offer it once shipments exist
+    if tracker.get_data_summary().empty:
+        st.info("📭 No data to back up yet. Upload carrier files first.")
+        return
     
-    # Clear processed files list
-    st.markdown("---")
+    # The workbook is only built when the button is clicked: Streamlit calls
+    # the data callable on download instead of on every run of this section
+    filename = f"freight_billing_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    st.download_button(
+        "📥 Download Complete Backup",
+        tracker.export_data_backup_bytes,
+        filename,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore"
+    )
+
+
+@st.fragment
+def show_reset_section(tracker):
+    """Reset section; a fragment, so a rejected confirmation reruns only this section"""
+    st.subheader("⚠️ Reset All Data")
+    st.error("🚨 **DANGER ZONE:** This will permanently delete ALL billing data")
+    
+    with st.form("reset_all_form"):
+        st.markdown(f"**To confirm, type:** `{tracker.RESET_CONFIRMATION_CODE}`")
+        confirmation_code = st.text_input("Confirmation Code", type="password")
+        
+        # Only true on the run triggered by the submit button, so reruns from
+        # other widgets never reach the clear path
+        if st.form_submit_button("🗑️ RESET ALL"):
+            if tracker.check_confirmation_code(confirmation_code):
+                success, message = tracker.clear_all_data(confirmation_code)
+                if success:
+                    check_existing_cached.clear()
+                    st.success("✅ All data has been cleared")
+                    # Full-app rerun so every page drops the cleared data
+                    st.rerun()
+                else:
+                    st.error(f"❌ {message}")
+            else:
+                st.error("❌ Incorrect confirmation code")
+
+
+@st.fragment
+def show_processed_files_section(tracker):
+    """Processed files list; a fragment, so clearing it reruns only this section"""
     st.subheader("🔄 Processed Files")
     
-    processed_count = len(tracker.config.get('processed_files', []))
-    st.write(f"**Files marked as processed:** {processed_count}")
+    processed_files = tracker.config['processed_files']
+    st.write(f"**Files marked as processed:** {len(processed_files)}")
     
-    if processed_count > 0:
+    if processed_files:
         with st.expander("View processed files"):
-            for f in tracker.config.get('processed_files', []):
-                st.write(f"- `{f}`")
+            # One element for the whole list instead of one st.write per file
+            st.code("\n".join(sorted(processed_files)), language=None)
         
         if st.button("🗑️ Clear Processed Files List"):
-            tracker.config['processed_files'] = []
-            tracker.save_config()
+            tracker.clear_processed_files()
             st.success("✅ Processed files list cleared. Files will show as 'new' on next scan.")
             st.rerun()
-    
-    # Data Files Info
-    st.markdown("---")
+
+
+@st.fragment
+def show_data_files_section(tracker):
+    """Data file status; a fragment, so other sections' reruns don't re-stat the files"""
     st.subheader("📁 Data Files")
     st.write(f"**Data Location:** `{tracker.data_folder}`")
     
     files = [
-        ("📦 Shipment Data", tracker.shipment_data_file),
+        ("📦 Shipment Data", tracker.shipment_data_dir),
         ("📋 Billing Checklist", tracker.billing_checklist_file),
         ("📝 Upload Log", tracker.upload_log_file),
         ("⚙️ Config", tracker.config_file)
     ]
     
-    for name, path in files:
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            if path.exists():
-                st.success(f"✅ {name}")
-            else:
-                st.error(f"❌ {name}")
-        with col2:
-            st.code(str(path))
+    # All four files live directly in the data folder: one directory read
+    # instead of a stat() per file
+    try:
+        with os.scandir(tracker.data_folder) as entries:
+            present = {entry.name for entry in entries}
+    except OSError:
+        present = set()
+    
+    # One table instead of a columns layout with two elements per file
+    st.dataframe(
+        pd.DataFrame({
+            'File': [name for name, _ in files],
+            'Status': ["✅ Found" if path.name in present else "❌ Missing" for _, path in files],
+            'Path': [str(path) for _, path in files]
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+def save_input_folder(tracker):
+    """on_change callback of the input folder field; runs before the rerun it triggers"""
+    new_folder = st.session_state.input_folder_path
+    tracker.set_input_folder(new_folder)
+    st.toast(f"✅ Input folder updated to: {new_folder}")
+
+
+def show_settings(tracker):
+    """Show settings page"""
+    st.header("⚙️ Settings")
+    
+    # Input Folder Configuration
+    st.subheader("📂 Input Folder Configuration")
+    
+    current_folder = tracker.get_input_folder()
+    
+    st.write(f"**Current Input Folder:** `{current_folder if current_folder else 'Not configured'}`")
+    
+    # Saved by the on_change callback when the field is committed (Enter or blur)
+    st.text_input(
+        "📁 Input Folder Path",
+        value=current_folder,
+        key="input_folder_path",
+        on_change=save_input_folder,
+        args=(tracker,),
+        placeholder=r"e.g., C:\BillingFiles or \\server\share\billing",
+        help="Enter the full path to the folder containing carrier files; it is saved when you press Enter"
+    )
+    
+    st.markdown(FILENAME_CONVENTION_MD)
+    
+    # Clear processed files list
+    st.markdown("---")
+    show_processed_files_section(tracker)
+    
+    # Data Files Info
+    st.markdown("---")
+    show_data_files_section(tracker)
     
     # Column Detection Help
     st.markdown("---")
     st.subheader("❓ Column Detection Help")
     
     with st.expander("🔧 Supported Column Names"):
-        st.markdown("""
-        **The system automatically detects these column variations:**
-        
-        - **Client:** `client`, `customer`, `customer_name`, `account`, `consignee`, `shipper`, `company`
-        - **Cost:** `cost`, `freight_cost`, `shipping_cost`, `carrier_charge`, `total_cost`
-        - **Billable Amount:** `billable`, `billable_amount`, `revenue`, `charge_amount`, `bill_amount`
-        - **Tracking:** `tracking`, `tracking_number`, `tracking_id`, `awb`, `pro`
-        - **Service:** `service`, `service_type`, `service_level`
-        - **Weight:** `weight`, `package_weight`, `total_weight`
-        - **Zone:** `zone`, `delivery_zone`, `shipping_zone`
-        - **Dates:** `ship_date`, `pickup_date`, `delivery_date`
-        """)
+        st.markdown(SUPPORTED_COLUMNS_MD)
 
 
 if __name__ == "__main__":